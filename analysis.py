@@ -5,10 +5,16 @@ Analyzes the usefulness of σ√T (sigma root T) as a trading indicator
 by examining historical IV data from the Rysk IV Tracker database.
 """
 
+import math
 import os
+import re
 import sys
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import date, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
 import statistics
 import json
 
@@ -19,42 +25,108 @@ except ImportError:
     os.system(f"{sys.executable} -m pip install requests")
     import requests
 
+try:
+    import numpy as np
+except ImportError:
+    print("Installing numpy...")
+    os.system(f"{sys.executable} -m pip install numpy")
+    import numpy as np
+
+# orjson is optional: it parses response bytes directly, falling back to json
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# numba is optional: without it the per-option scan falls back to NumPy
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+from requests.adapters import HTTPAdapter
+
 # API base URL
 API_BASE = "https://rysk-biscuit.vercel.app"
 
+# Bound once for the per-row σ√T hot path
+_sqrt = math.sqrt
+_INV365 = 1.0 / 365.0
+
+MAX_FETCH_WORKERS = 16
+
+# Raw API responses are cached per (asset, days, date) between runs
+CACHE_DIR = Path('.cache')
 
+# Raw per-row fields and the per-option point layout used by the analyses.
+# IV values carry only a few significant figures, so points are stored as
+# float32; reductions that need the extra precision upcast first.
+ROW_DT = np.dtype([('ts', 'datetime64[s]'), ('expiry', 'datetime64[s]'),
+                   ('iv', 'f8'), ('apy', 'f8')])
+POINT_DT = np.dtype([('ts', 'datetime64[s]'), ('iv', 'f4'), ('dte', 'i2'),
+                     ('srt', 'f4'), ('apy', 'f4')])
+
+# Shared session so per-asset fetches reuse pooled keep-alive connections
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=MAX_FETCH_WORKERS,
+                                      pool_maxsize=MAX_FETCH_WORKERS))
+
+
+_MONTHS = {'JAN':1,'FEB':2,'MAR':3,'APR':4,'MAY':5,'JUN':6,
+           'JUL':7,'AUG':8,'SEP':9,'OCT':10,'NOV':11,'DEC':12}
+_EXPIRY_RE = re.compile(r'(\d{2})([A-Za-z]{3})(\d{2})')
+
+
+@lru_cache(maxsize=None)
 def parse_expiry(expiry_str):
     """Parse expiry string like '13FEB26' to datetime."""
-    months = {'JAN':1,'FEB':2,'MAR':3,'APR':4,'MAY':5,'JUN':6,
-              'JUL':7,'AUG':8,'SEP':9,'OCT':10,'NOV':11,'DEC':12}
+    m = _EXPIRY_RE.match(expiry_str) if isinstance(expiry_str, str) else None
+    if not m:
+        return None
+    day, mon, yr = m.groups()
     try:
-        day = int(expiry_str[:2])
-        mon = months[expiry_str[2:5].upper()]
-        yr = 2000 + int(expiry_str[5:7])
-        return datetime(yr, mon, day)
-    except:
+        return datetime(2000 + int(yr), _MONTHS[mon.upper()], int(day))
+    except (KeyError, ValueError):
         return None
 
 
+_ts_cache = {}
+
+
 def parse_timestamp(timestamp):
     """Parse various timestamp formats."""
     if isinstance(timestamp, datetime):
         return timestamp.replace(tzinfo=None)
     if isinstance(timestamp, str):
-        # Try RFC 2822 format: 'Tue, 27 Jan 2026 23:22:00 GMT'
-        try:
-            from email.utils import parsedate_to_datetime
-            return parsedate_to_datetime(timestamp).replace(tzinfo=None)
-        except:
-            pass
-        # Try ISO format
-        try:
-            return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).replace(tzinfo=None)
-        except:
-            pass
+        # Membership test: unparseable strings are cached as None too
+        if timestamp in _ts_cache:
+            return _ts_cache[timestamp]
+        parsed = _parse_timestamp_str(timestamp)
+        _ts_cache[timestamp] = parsed
+        return parsed
     return None
 
 
+def _parse_timestamp_str(timestamp):
+    """Parse a timestamp string (RFC 2822 or ISO)."""
+    # Pick the format by inspection rather than by trying each and catching
+    # the failure: RFC 2822 looks like 'Tue, 27 Jan 2026 23:22:00 GMT'
+    try:
+        if timestamp.endswith('GMT'):
+            return parsedate_to_datetime(timestamp).replace(tzinfo=None)
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
 def calc_dte(expiry_str, timestamp):
     """Calculate days to expiry."""
     expiry_date = parse_expiry(expiry_str)
@@ -71,26 +143,245 @@ def calc_sigma_root_t(iv, dte):
     """Calculate σ√T = IV × √(DTE/365)."""
     if dte is None or dte <= 0 or iv is None:
         return None
-    return iv * (dte / 365) ** 0.5
-
-
-def fetch_data(days=30):
-    """Fetch historical IV data from API."""
+    return iv * _sqrt(dte * _INV365)
+
+
+def group_options(data):
+    """
+    Group rows by option (asset-strike-expiry) in one vectorized pass.
+
+    DTE and σ√T are computed on whole columns, then the rows are
+    partitioned by option with a single lexsort on (option, timestamp).
+    Returns {key: structured array sorted by time} and {key: asset}.
+    """
+    # Parse each distinct expiry once
+    expiry_dt_map = {e: parse_expiry(e) for e in {row['expiry'] for row in data}}
+    rows = [row for row in data
+            if expiry_dt_map[row['expiry']] is not None and row['mid_iv'] is not None]
+    if not rows:
+        return {}, {}
+
+    keys = np.array([f"{row['asset']}-{row['strike']}-{row['expiry']}" for row in rows])
+    raw = np.array(
+        [(parse_timestamp(row['timestamp']), expiry_dt_map[row['expiry']], row['mid_iv'],
+          row['apy'] if row['apy'] is not None else np.nan) for row in rows],
+        dtype=ROW_DT,
+    )
+
+    dte = np.maximum((raw['expiry'] - raw['ts']).astype('timedelta64[D]').astype(np.int64), 0)
+    valid = ~np.isnat(raw['ts']) & (dte > 0)
+    raw = raw[valid]
+    dte = dte[valid]
+
+    points = np.empty(raw.size, dtype=POINT_DT)
+    points['ts'] = raw['ts']
+    points['iv'] = raw['iv']
+    points['dte'] = dte
+    points['srt'] = raw['iv'] * np.sqrt(dte * _INV365)
+    points['apy'] = raw['apy']
+
+    row_idx = np.flatnonzero(valid)
+    unique_keys, first, codes = np.unique(keys[valid], return_index=True, return_inverse=True)
+    order = np.lexsort((points['ts'], codes))
+    points = points[order]
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+
+    options = dict(zip(unique_keys.tolist(), np.split(points, bounds)))
+    option_assets = {k: rows[i]['asset'] for k, i in zip(unique_keys.tolist(), row_idx[first])}
+    return options, option_assets
+
+
+def pearson(x, y):
+    """Pearson correlation of two arrays, or None if either is constant."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.std() == 0 or y.std() == 0:
+        return None
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+@njit(cache=True, fastmath=True)
+def _scan_options_loop(srt, iv, off):
+    """Single-pass per-option stats over CSR-packed srt/iv columns."""
+    n = off.size - 1
+    first_srt = np.empty(n)
+    last_srt = np.empty(n)
+    first_iv = np.empty(n)
+    last_iv = np.empty(n)
+    srt_mean = np.empty(n)
+    srt_std = np.empty(n)
+    iv_mean = np.empty(n)
+    iv_std = np.empty(n)
+    first_half = np.empty(n)
+    second_half = np.empty(n)
+
+    for gi in range(n):
+        s = off[gi]
+        e = off[gi + 1]
+        mid = s + (e - s) // 2
+        first_srt[gi] = srt[s]
+        last_srt[gi] = srt[e - 1]
+        first_iv[gi] = iv[s]
+        last_iv[gi] = iv[e - 1]
+
+        # Welford's running mean/variance
+        ms = 0.0
+        m2s = 0.0
+        mi = 0.0
+        m2i = 0.0
+        half_sum = 0.0
+        for j in range(s, e):
+            k = j - s + 1
+            d = srt[j] - ms
+            ms += d / k
+            m2s += d * (srt[j] - ms)
+            d = iv[j] - mi
+            mi += d / k
+            m2i += d * (iv[j] - mi)
+            if j < mid:
+                half_sum += srt[j]
+
+        count = e - s
+        srt_mean[gi] = ms
+        iv_mean[gi] = mi
+        srt_std[gi] = (m2s / (count - 1)) ** 0.5 if count > 1 else 0.0
+        iv_std[gi] = (m2i / (count - 1)) ** 0.5 if count > 1 else 0.0
+        first_half[gi] = half_sum / (mid - s) if mid > s else ms
+        second_half[gi] = (ms * count - half_sum) / (e - mid)
+
+    return (first_srt, last_srt, first_iv, last_iv, srt_mean, srt_std,
+            iv_mean, iv_std, first_half, second_half)
+
+
+def _scan_options_numpy(srt, iv, off):
+    """NumPy equivalent of _scan_options_loop using segment reductions."""
+    starts = off[:-1]
+    ends = off[1:]
+    counts = ends - starts
+    mids = starts + counts // 2
+    ddof_counts = np.maximum(counts - 1, 1)
+
+    srt_mean = np.add.reduceat(srt, starts) / counts
+    iv_mean = np.add.reduceat(iv, starts) / counts
+    srt_std = np.sqrt(np.add.reduceat((srt - np.repeat(srt_mean, counts)) ** 2, starts) / ddof_counts)
+    iv_std = np.sqrt(np.add.reduceat((iv - np.repeat(iv_mean, counts)) ** 2, starts) / ddof_counts)
+
+    # Alternating [start, mid] boundaries give first-half and second-half sums
+    half_sums = np.add.reduceat(srt, np.column_stack([starts, mids]).ravel())
+    first_half = half_sums[0::2] / (mids - starts)
+    second_half = half_sums[1::2] / (ends - mids)
+
+    return (srt[starts], srt[ends - 1], iv[starts], iv[ends - 1], srt_mean, srt_std,
+            iv_mean, iv_std, first_half, second_half)
+
+
+def pack_options(arrays):
+    """Concatenate per-option point arrays into one array plus CSR offsets."""
+    off = np.cumsum([0] + [a.size for a in arrays])
+    return np.concatenate(arrays), off
+
+
+def scan_options(points, off):
+    """
+    Compute per-option summary stats over packed points (see pack_options).
+
+    Each option must hold at least 2 points. Uses the numba kernel when
+    available, otherwise an equivalent NumPy implementation.
+    Returns a dict of per-option result arrays.
+    """
+    srt = points['srt'].astype(np.float64)
+    iv = points['iv'].astype(np.float64)
+    scan = _scan_options_loop if NUMBA_AVAILABLE else _scan_options_numpy
+    names = ('first_srt', 'last_srt', 'first_iv', 'last_iv', 'srt_mean', 'srt_std',
+             'iv_mean', 'iv_std', 'first_half', 'second_half')
+    results = dict(zip(names, scan(srt, iv, off)))
+    results['count'] = np.diff(off)
+    return results
+
+
+def lag1_autocorr(srt, off):
+    """
+    Lag-1 autocorrelation of packed per-option series from running moments.
+
+    Pairs are the overlapping views srt[:-1] / srt[1:] with the pairs that
+    straddle two options subtracted out, so no pair arrays are built.
+    Returns (correlation or None, number of pairs).
+    """
+    # Options with fewer than 2 points contribute no pairs; empty ones must
+    # also be dropped from the offsets so no boundary pair is counted twice
+    lengths = np.diff(off)
+    n = int((lengths[lengths >= 2] - 1).sum())
+    if n < 2:
+        return None, n
+    off = off[np.r_[True, lengths > 0]]
+
+    srt = srt.astype(np.float64)
+    x = srt[:-1]
+    y = srt[1:]
+    cross = off[1:-1] - 1  # pairs linking one option's last point to the next's first
+    xb = x[cross]
+    yb = y[cross]
+
+    sx = x.sum() - xb.sum()
+    sy = y.sum() - yb.sum()
+    sxx = np.dot(x, x) - np.dot(xb, xb)
+    syy = np.dot(y, y) - np.dot(yb, yb)
+    sxy = np.dot(x, y) - np.dot(xb, yb)
+
+    var_x = n * sxx - sx * sx
+    var_y = n * syy - sy * sy
+    if var_x <= 0 or var_y <= 0:
+        return None, n
+    return float((n * sxy - sx * sy) / (var_x ** 0.5 * var_y ** 0.5)), n
+
+
+def group_mean_std(values, codes, n_groups):
+    """Per-group mean, sample stdev and count of values labelled by codes."""
+    values = values.astype(np.float64)
+    counts = np.bincount(codes, minlength=n_groups)
+    safe_counts = np.maximum(counts, 1)
+    means = np.bincount(codes, weights=values, minlength=n_groups) / safe_counts
+    sq_dev = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=n_groups)
+    stds = np.where(counts > 1, np.sqrt(sq_dev / np.maximum(counts - 1, 1)), 0.0)
+    return means, stds, counts
+
+
+def fetch_data(days=30, use_cache=True):
+    """
+    Fetch historical IV data from API.
+
+    Each asset's response body is cached under CACHE_DIR for the current
+    day, so repeated runs skip the network entirely.
+    """
     # Get list of assets
-    assets_resp = requests.get(f"{API_BASE}/api/assets")
-    assets = assets_resp.json()
+    assets_resp = session.get(f"{API_BASE}/api/assets")
+    assets = _loads(assets_resp.content)
+    if not assets:
+        return []
 
-    all_data = []
     print(f"Fetching data for {len(assets)} assets...")
 
-    for asset in assets:
-        print(f"  Fetching {asset}...", end=" ")
-        resp = requests.get(f"{API_BASE}/api/iv/{asset}?days={days}")
-        data = resp.json()
-        print(f"{len(data)} records")
-        all_data.extend(data)
+    if use_cache:
+        CACHE_DIR.mkdir(exist_ok=True)
+    today = date.today().isoformat()
+
+    def fetch_asset(asset):
+        path = CACHE_DIR / f"{asset}_{days}_{today}.json"
+        if use_cache and path.exists():
+            return _loads(path.read_bytes())
+        resp = session.get(f"{API_BASE}/api/iv/{asset}?days={days}")
+        if use_cache and resp.ok:
+            path.write_bytes(resp.content)
+        return _loads(resp.content)
+
+    # Requests are network-bound, so fetch all assets concurrently
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(assets))) as ex:
+        results = list(ex.map(fetch_asset, assets))
 
-    return all_data
+    for asset, data in zip(assets, results):
+        print(f"  {asset}: {len(data)} records")
+
+    return list(chain.from_iterable(results))
 
 
 def analyze_data(data):
@@ -100,20 +391,7 @@ def analyze_data(data):
     print("="*60)
 
     # Group by option (asset-strike-expiry)
-    options = defaultdict(list)
-    for row in data:
-        key = f"{row['asset']}-{row['strike']}-{row['expiry']}"
-        dte = calc_dte(row['expiry'], row['timestamp'])
-        srt = calc_sigma_root_t(row['mid_iv'], dte)
-        if srt is not None:
-            options[key].append({
-                'timestamp': row['timestamp'],
-                'iv': row['mid_iv'],
-                'dte': dte,
-                'srt': srt,
-                'apy': row['apy'],
-                'asset': row['asset']
-            })
+    options, option_assets = group_options(data)
 
     print(f"\nData Summary:")
     print(f"  Total records: {len(data)}")
@@ -121,47 +399,33 @@ def analyze_data(data):
     print(f"  Assets: {set(row['asset'] for row in data)}")
 
     # Filter options with enough data points
-    options_with_data = {k: v for k, v in options.items() if len(v) >= 5}
+    options_with_data = {k: v for k, v in options.items() if v.size >= 5}
     print(f"  Options with 5+ data points: {len(options_with_data)}")
 
     if not options_with_data:
         print("\nNot enough data for analysis. Need more historical records.")
         return
 
+    # Pack every option into flat columns once; per-option summary stats
+    # and column views are shared by all the analyses below
+    points, off = pack_options(list(options_with_data.values()))
+    all_srt = points['srt']
+    stats = scan_options(points, off)
+
     # Analysis 1: σ√T Trend Analysis
     print("\n" + "-"*60)
     print("ANALYSIS 1: σ√T TREND PATTERNS")
     print("-"*60)
 
-    rising_srt = 0
-    falling_srt = 0
-    flat_srt = 0
-
-    srt_changes = []
-    iv_changes = []
-
-    for key, points in options_with_data.items():
-        points = sorted(points, key=lambda x: x['timestamp'])
-        if len(points) < 2:
-            continue
-
-        first_srt = points[0]['srt']
-        last_srt = points[-1]['srt']
-        first_iv = points[0]['iv']
-        last_iv = points[-1]['iv']
-
-        srt_change_pct = (last_srt - first_srt) / first_srt * 100 if first_srt > 0 else 0
-        iv_change_pct = (last_iv - first_iv) / first_iv * 100 if first_iv > 0 else 0
+    first_srt = stats['first_srt']
+    first_iv = stats['first_iv']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        srt_changes = np.where(first_srt > 0, (stats['last_srt'] - first_srt) / first_srt * 100, 0.0)
+        iv_changes = np.where(first_iv > 0, (stats['last_iv'] - first_iv) / first_iv * 100, 0.0)
 
-        srt_changes.append(srt_change_pct)
-        iv_changes.append(iv_change_pct)
-
-        if srt_change_pct > 5:
-            rising_srt += 1
-        elif srt_change_pct < -5:
-            falling_srt += 1
-        else:
-            flat_srt += 1
+    rising_srt = int((srt_changes > 5).sum())
+    falling_srt = int((srt_changes < -5).sum())
+    flat_srt = srt_changes.size - rising_srt - falling_srt
 
     total = rising_srt + falling_srt + flat_srt
     if total > 0:
@@ -178,19 +442,14 @@ def analyze_data(data):
     srt_volatilities = []
     iv_volatilities = []
 
-    for key, points in options_with_data.items():
-        if len(points) < 3:
-            continue
-        srt_values = [p['srt'] for p in points]
-        iv_values = [p['iv'] for p in points]
-
+    for i in range(len(stats['srt_mean'])):
         # Calculate coefficient of variation (std/mean)
-        srt_mean = statistics.mean(srt_values)
-        iv_mean = statistics.mean(iv_values)
+        srt_mean = stats['srt_mean'][i]
+        iv_mean = stats['iv_mean'][i]
 
         if srt_mean > 0 and iv_mean > 0:
-            srt_cv = statistics.stdev(srt_values) / srt_mean
-            iv_cv = statistics.stdev(iv_values) / iv_mean
+            srt_cv = stats['srt_std'][i] / srt_mean
+            iv_cv = stats['iv_std'][i] / iv_mean
             srt_volatilities.append(srt_cv)
             iv_volatilities.append(iv_cv)
 
@@ -213,29 +472,18 @@ def analyze_data(data):
     print("-"*60)
 
     # For each option, check if high σ√T tends to fall and low tends to rise
-    reversion_count = 0
-    continuation_count = 0
-
-    for key, points in options_with_data.items():
-        points = sorted(points, key=lambda x: x['timestamp'])
-        if len(points) < 10:
-            continue
-
-        srt_values = [p['srt'] for p in points]
-        mean_srt = statistics.mean(srt_values)
-
-        # Look at first half vs second half
-        mid = len(points) // 2
-        first_half_avg = statistics.mean([p['srt'] for p in points[:mid]])
-        second_half_avg = statistics.mean([p['srt'] for p in points[mid:]])
-
-        # If first half was above mean and second half moved toward mean, that's reversion
-        if first_half_avg > mean_srt and second_half_avg < first_half_avg:
-            reversion_count += 1
-        elif first_half_avg < mean_srt and second_half_avg > first_half_avg:
-            reversion_count += 1
-        else:
-            continuation_count += 1
+    eligible = stats['count'] >= 10
+    mean_srt = stats['srt_mean'][eligible]
+
+    # Look at first half vs second half
+    first_half_avg = stats['first_half'][eligible]
+    second_half_avg = stats['second_half'][eligible]
+
+    # If first half was above mean and second half moved toward mean, that's reversion
+    reverted = (((first_half_avg > mean_srt) & (second_half_avg < first_half_avg)) |
+                ((first_half_avg < mean_srt) & (second_half_avg > first_half_avg)))
+    reversion_count = int(reverted.sum())
+    continuation_count = int(eligible.sum()) - reversion_count
 
     total_mr = reversion_count + continuation_count
     if total_mr > 0:
@@ -254,18 +502,10 @@ def analyze_data(data):
     print("ANALYSIS 4: σ√T vs IV CORRELATION")
     print("-"*60)
 
-    if len(srt_changes) > 2 and len(iv_changes) > 2:
-        # Calculate Pearson correlation manually
-        n = len(srt_changes)
-        mean_srt_chg = sum(srt_changes) / n
-        mean_iv_chg = sum(iv_changes) / n
+    if srt_changes.size > 2 and iv_changes.size > 2:
+        correlation = pearson(srt_changes, iv_changes)
 
-        numerator = sum((s - mean_srt_chg) * (i - mean_iv_chg) for s, i in zip(srt_changes, iv_changes))
-        denom_srt = sum((s - mean_srt_chg) ** 2 for s in srt_changes) ** 0.5
-        denom_iv = sum((i - mean_iv_chg) ** 2 for i in iv_changes) ** 0.5
-
-        if denom_srt > 0 and denom_iv > 0:
-            correlation = numerator / (denom_srt * denom_iv)
+        if correlation is not None:
             print(f"\n  Correlation between σ√T change and IV change: {correlation:.3f}")
             print(f"\n  Interpretation:")
             if correlation > 0.7:
@@ -281,27 +521,11 @@ def analyze_data(data):
     print("ANALYSIS 5: PREDICTIVE VALUE (Autocorrelation)")
     print("-"*60)
 
-    all_srt_pairs = []  # (today's srt, tomorrow's srt)
-
-    for key, points in options_with_data.items():
-        points = sorted(points, key=lambda x: x['timestamp'])
-        for i in range(len(points) - 1):
-            all_srt_pairs.append((points[i]['srt'], points[i+1]['srt']))
-
-    if len(all_srt_pairs) > 10:
-        today_srt = [p[0] for p in all_srt_pairs]
-        tomorrow_srt = [p[1] for p in all_srt_pairs]
+    # Correlation of each point's σ√T with the next point's, within each option
+    autocorr, n_pairs = lag1_autocorr(all_srt, off)
 
-        n = len(today_srt)
-        mean_today = sum(today_srt) / n
-        mean_tomorrow = sum(tomorrow_srt) / n
-
-        numerator = sum((t - mean_today) * (m - mean_tomorrow) for t, m in zip(today_srt, tomorrow_srt))
-        denom_today = sum((t - mean_today) ** 2 for t in today_srt) ** 0.5
-        denom_tomorrow = sum((m - mean_tomorrow) ** 2 for m in tomorrow_srt) ** 0.5
-
-        if denom_today > 0 and denom_tomorrow > 0:
-            autocorr = numerator / (denom_today * denom_tomorrow)
+    if n_pairs > 10:
+        if autocorr is not None:
             print(f"\n  Autocorrelation (lag-1): {autocorr:.3f}")
             print(f"\n  Interpretation:")
             if autocorr > 0.8:
@@ -317,24 +541,20 @@ def analyze_data(data):
     print("ANALYSIS 6: ASSET COMPARISON")
     print("-"*60)
 
-    asset_stats = defaultdict(lambda: {'srt_values': [], 'iv_values': []})
-
-    for key, points in options_with_data.items():
-        asset = points[0]['asset']
-        for p in points:
-            asset_stats[asset]['srt_values'].append(p['srt'])
-            asset_stats[asset]['iv_values'].append(p['iv'])
+    # Label every packed point with its asset and reduce per asset in one pass
+    asset_names, option_codes = np.unique(
+        [option_assets[k] for k in options_with_data], return_inverse=True)
+    point_codes = np.repeat(option_codes, stats['count'])
+    srt_avgs, srt_stds, asset_counts = group_mean_std(points['srt'], point_codes, asset_names.size)
+    iv_avgs, iv_stds, _ = group_mean_std(points['iv'], point_codes, asset_names.size)
 
     print(f"\n  {'Asset':<8} {'Avg σ√T':<12} {'Avg IV':<12} {'σ√T StdDev':<12} {'IV StdDev':<12}")
     print(f"  {'-'*8} {'-'*12} {'-'*12} {'-'*12} {'-'*12}")
 
-    for asset, stats in sorted(asset_stats.items()):
-        if len(stats['srt_values']) >= 5:
-            avg_srt = statistics.mean(stats['srt_values'])
-            avg_iv = statistics.mean(stats['iv_values'])
-            std_srt = statistics.stdev(stats['srt_values']) if len(stats['srt_values']) > 1 else 0
-            std_iv = statistics.stdev(stats['iv_values']) if len(stats['iv_values']) > 1 else 0
-            print(f"  {asset:<8} {avg_srt:<12.2f} {avg_iv:<12.2f} {std_srt:<12.2f} {std_iv:<12.2f}")
+    for i, asset in enumerate(asset_names.tolist()):
+        if asset_counts[i] >= 5:
+            print(f"  {asset:<8} {srt_avgs[i]:<12.2f} {iv_avgs[i]:<12.2f} "
+                  f"{srt_stds[i]:<12.2f} {iv_stds[i]:<12.2f}")
 
     # Summary
     print("\n" + "="*60)
@@ -367,7 +587,7 @@ Run this analysis with more data (30+ days) for more reliable results.
 def main():
     print("Fetching data from database...")
     try:
-        data = fetch_data(days=30)
+        data = fetch_data(days=30, use_cache='--no-cache' not in sys.argv)
         if not data:
             print("No data found in database.")
             return
@@ -6,40 +6,182 @@ Uses PostgreSQL (Supabase) for data storage.
 """
 
 import os
+import logging
+import gzip
+import hashlib
 import json
+import math
 import re
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request, render_template_string, make_response
+from decimal import Decimal
+from functools import lru_cache
+from flask import Flask, g, has_request_context, request
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
+import orjson
+
+# Black-Scholes constants; _ndtr's fallback below reads _SQRT_HALF
+RISK_FREE_RATE = 0.05
+_INV_SQRT_2PI = 1.0 / math.sqrt(2 * math.pi)
+_SQRT_HALF = math.sqrt(0.5)
+
+try:
+    from scipy.special import ndtr as _ndtr
+except ImportError:
+    # erfc(z) = t * exp(-z^2 + sum(c_k * T_k(u))) with t = 2 / (2 + z) mapped onto
+    # u in [-1, 1]; Chebyshev coefficients fitted to math.erfc for 0 <= z <= 10
+    # (absolute error < 2e-15, erfc(10) is already below double resolution)
+    _ERFC_ZMAX = 10.0
+    _ERFC_TMIN = 2.0 / (2.0 + _ERFC_ZMAX)
+    _ERFC_CHEB = np.array([
+        -0.5511712503141013, 0.5502563182397049, 0.007267847232713505, -0.006366320664966277,
+        -0.00015938484563135443, 0.000180990701711694, -2.5158306728934122e-06, -6.420078986021069e-06,
+        5.681936731534547e-07, 2.142978387630521e-07, -4.464017495073593e-08, -4.607168480187133e-09,
+        2.492978218344511e-09, -9.625186108961445e-11, -9.923710221322164e-11, 1.7555193677960228e-11,
+        1.973761135208894e-12, -1.056630227255577e-12, 7.044985616158228e-14, 3.445437795650242e-14,
+        -8.37978948782358e-15, -3.4003947799746685e-17, 5.179380518069182e-16,
+    ])
+
+    def _ndtr(x):
+        """Standard normal CDF (vectorized fallback when SciPy is not installed)."""
+        z = np.minimum(np.abs(x) * _SQRT_HALF, _ERFC_ZMAX)
+        t = 2.0 / (2.0 + z)
+        u = (2.0 * t - (1.0 + _ERFC_TMIN)) / (1.0 - _ERFC_TMIN)
+        tail = 0.5 * t * np.exp(np.polynomial.chebyshev.chebval(u, _ERFC_CHEB) - z * z)
+        return np.where(x < 0, tail, 1.0 - tail)
+
+# numba is optional: without it the IV solve runs as a vectorized NumPy loop
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
 # Database connection
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 
 app = Flask(__name__)
 
+log = logging.getLogger('rysk')
+log.setLevel(logging.INFO)
+
+# Serve the last good copy for up to a day if the origin starts failing
+STALE_IF_ERROR = 86400
+
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _json_default(obj):
+    """orjson fallback for types it does not serialize natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def encode_json(data):
+    """Serialize data to JSON bytes with orjson (timestamps as ISO 8601 UTC)."""
+    return orjson.dumps(data, default=_json_default, option=_ORJSON_OPTIONS)
+
+
+def encode_json_rows(cursor, batch_size=500):
+    """Encode a cursor's rows as a JSON array one fetchmany batch at a time."""
+    parts = []
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        parts.append(encode_json(rows)[1:-1])
+    return b'[' + b','.join(parts) + b']'
+
+
+def ojsonify(data):
+    """Build a JSON response; bytes are taken as already-encoded JSON."""
+    body = data if isinstance(data, bytes) else encode_json(data)
+    return app.response_class(body, mimetype='application/json')
+
+
+def error_response(e):
+    """Log the failing request and return a 500 JSON error (never cached as data)."""
+    log.exception('%s %s failed', request.method, request.path)
+    return ojsonify({'error': str(e)}), 500
+
 
 def cached_json(data, max_age=60, stale_revalidate=300, cdn_max_age=None):
-    """Return a JSON response with Cache-Control headers to reduce Fast Origin Transfer."""
-    resp = make_response(jsonify(data))
-    resp.headers['Cache-Control'] = f'public, max-age={max_age}, stale-while-revalidate={stale_revalidate}'
+    """Return a JSON response with Cache-Control and ETag headers to reduce Fast Origin Transfer."""
+    resp = ojsonify(data)
+    resp.headers['Cache-Control'] = f'public, max-age={max_age}, stale-while-revalidate={stale_revalidate}, stale-if-error={STALE_IF_ERROR}'
     cdn = cdn_max_age or max_age * 2
-    resp.headers['Vercel-CDN-Cache-Control'] = f'public, max-age={cdn}, stale-while-revalidate={stale_revalidate}'
-    return resp
+    resp.headers['Vercel-CDN-Cache-Control'] = f'public, max-age={cdn}, stale-while-revalidate={stale_revalidate}, stale-if-error={STALE_IF_ERROR}'
+    # Weak ETag over the body so revalidations can be answered with an empty 304
+    resp.set_etag(hashlib.blake2b(resp.get_data(), digest_size=8).hexdigest(), weak=True)
+    return resp.make_conditional(request)
+
+
+@lru_cache(maxsize=None)
+def _encode_page(html_str):
+    """Encode a static page once: (body, gzipped body, ETag)."""
+    body = html_str.encode('utf-8')
+    return body, gzip.compress(body, 9), hashlib.md5(body).hexdigest()
 
 
 def cached_html(html_str, max_age=300, stale_revalidate=3600):
-    """Return an HTML response with Cache-Control headers."""
-    resp = make_response(render_template_string(html_str))
-    resp.headers['Cache-Control'] = f'public, max-age={max_age}, stale-while-revalidate={stale_revalidate}'
-    resp.headers['Vercel-CDN-Cache-Control'] = f'public, max-age={max_age * 2}, stale-while-revalidate={stale_revalidate}'
+    """Return a static HTML page (gzipped when accepted) with Cache-Control headers."""
+    body, body_gz, etag = _encode_page(html_str)
+    if 'gzip' in request.accept_encodings:
+        resp = app.response_class(body_gz, mimetype='text/html')
+        resp.headers['Content-Encoding'] = 'gzip'
+        resp.set_etag(etag + '-gz')
+    else:
+        resp = app.response_class(body, mimetype='text/html')
+        resp.set_etag(etag)
+    resp.vary.add('Accept-Encoding')
+    resp.headers['Cache-Control'] = f'public, max-age={max_age}, stale-while-revalidate={stale_revalidate}, stale-if-error={STALE_IF_ERROR}'
+    resp.headers['Vercel-CDN-Cache-Control'] = f'public, max-age={max_age * 2}, stale-while-revalidate={stale_revalidate}, stale-if-error={STALE_IF_ERROR}'
+    return resp.make_conditional(request)
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def add_server_timing(resp):
+    """Stamp Server-Timing with DB and total handler time for external profiling."""
+    total_ms = (time.perf_counter() - g.request_started) * 1000
+    resp.headers['Server-Timing'] = f"db;dur={g.get('db_time', 0.0) * 1000:.1f}, total;dur={total_ms:.1f}"
     return resp
 
 
 # Configuration
 DATABASE_URL = os.environ.get('DATABASE_URL', '')
 CRON_SECRET = os.environ.get('CRON_SECRET', '')
+# A serverless instance serves one request at a time, so keep the pool small;
+# concurrent borrowers (threaded dev server, /api/activity/all) wait for a slot.
+# psycopg2 only keeps PG_POOL_MIN idle connections; extras are closed on return.
+PG_POOL_MIN = int(os.environ.get('PG_POOL_MIN', '1'))
+PG_POOL_MAX = int(os.environ.get('PG_POOL_MAX', '3'))
+# Seconds to wait for a free pooled connection before opening a one-off one
+PG_POOL_WAIT = float(os.environ.get('PG_POOL_WAIT', '5'))
+# Stay under Vercel's 10s function limit so a slow query fails with an error
+PG_STATEMENT_TIMEOUT_MS = int(os.environ.get('PG_STATEMENT_TIMEOUT_MS', '8000'))
+# Supabase's transaction-mode pooler (pgbouncer/Supavisor) listens on 6543
+PG_TRANSACTION_POOLER = ':6543' in DATABASE_URL
 
 # On-Chain Activity Configuration
 HYPERVM_RPC = 'https://rpc.hyperliquid.xyz/evm'
@@ -54,6 +196,16 @@ TOPIC_SHORT_OTOKEN_MINTED = '0x4d7f96086c92b2f9a254ad21548b1c1f2d99502c794950886
 TOPIC_COLLATERAL_DEPOSITED = '0xbfab88b861f171b7db714f00e5966131253918d55ddba816c3eb94657d102390'
 TOPIC_TRANSFER_TO_USER = '0x60a0dc9b39e897fcb3abc1fbd47021fe4df80b4bbc379d3ebd3a5dd756895a14'
 
+# (topic0, emitting contract) -> event decoded into a position, keys lowercased
+# once here so log matching is a single dict lookup
+EVENT_KINDS = {
+    (TOPIC_OTOKEN_CREATED.lower(), OTOKEN_FACTORY.lower()): 'otoken_created',
+    (TOPIC_SHORT_OTOKEN_MINTED.lower(), CONTROLLER_CONTRACT.lower()): 'short_minted',
+    (TOPIC_COLLATERAL_DEPOSITED.lower(), CONTROLLER_CONTRACT.lower()): 'collateral_deposited',
+    (TOPIC_TRANSFER_TO_USER.lower(), RYSK_MARGIN_POOL.lower()): 'transfer_to_user',
+}
+FEE_RECIPIENT_LC = FEE_RECIPIENT.lower()
+
 # Known token addresses on HyperEVM (lowercase for comparison)
 TOKEN_INFO = {
     '0xb88339cb7199b77e23db6e890353e22632ba630f': {'symbol': 'USDC', 'decimals': 6},
@@ -62,6 +214,9 @@ TOKEN_INFO = {
     '0xfd739d4e423301ce9385c1fb8850539d657c296d': {'symbol': 'kHYPE', 'decimals': 18},
 }
 
+# Raw on-chain amount divisor per token, computed once
+TOKEN_SCALE = {addr: 10 ** info['decimals'] for addr, info in TOKEN_INFO.items()}
+
 # Underlying token address -> tracked asset name
 UNDERLYING_TO_ASSET = {
     '0xb8ce59fc3717ada4c02eadf9682a9e934f625ebb': 'HYPE',
@@ -69,7 +224,15 @@ UNDERLYING_TO_ASSET = {
     '0x9fdbda0a5e284c32744d2f17ee5c74b284993463': 'BTC',
 }
 
+# Every contract/event the position decoder reads, fetched in one eth_getLogs
+# call per block window instead of a receipt lookup per transaction
+INDEXED_CONTRACTS = [CONTROLLER_CONTRACT, OTOKEN_FACTORY, RYSK_MARGIN_POOL]
+INDEXED_TOPICS = [[TOPIC_OTOKEN_CREATED, TOPIC_SHORT_OTOKEN_MINTED,
+                   TOPIC_COLLATERAL_DEPOSITED, TOPIC_TRANSFER_TO_USER]]
+
 LOGS_BLOCK_RANGE = 1000
+LOGS_BATCH_WINDOWS = 10  # getLogs windows packed into one batched RPC request
+RPC_BATCH_SIZE = 50  # per-block/per-tx calls packed into one batched RPC request
 MAX_BLOCKS_PER_CRON = 50000
 ACTIVITY_START_BLOCK = int(os.environ.get('ACTIVITY_START_BLOCK', '27000000'))
 INDEXER_TIME_BUDGET = 8  # seconds - stop before Vercel 10s timeout
@@ -83,8 +246,8 @@ DASHBOARD_HTML = '''
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Rysk IV Tracker</title>
     <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🍪</text></svg>">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/chartjs-adapter-date-fns"></script>
+    <script defer src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <script defer src="https://cdn.jsdelivr.net/npm/chartjs-adapter-date-fns"></script>
     <style>
         * { margin: 0; padding: 0; box-sizing: border-box; }
         body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #0d1117; color: #c9d1d9; min-height: 100vh; padding: 20px; }
@@ -104,6 +267,8 @@ DASHBOARD_HTML = '''
         .card h2 { font-size: 16px; margin-bottom: 15px; color: #8b949e; }
         .chart-container { position: relative; height: 300px; }
         .chart-container-large { position: relative; height: 450px; }
+        /* Canvases carry their desktop backing size as attributes; CSS keeps them in the box until Chart.js sizes them */
+        .chart-container canvas, .chart-container-large canvas { display: block; width: 100%; height: 100%; }
         table { width: 100%; border-collapse: collapse; font-size: 13px; }
         th, td { padding: 10px; text-align: left; border-bottom: 1px solid #21262d; }
         th { color: #8b949e; font-weight: 500; text-transform: uppercase; font-size: 11px; }
@@ -257,7 +422,7 @@ DASHBOARD_HTML = '''
                     </label>
                 </div>
             </div>
-            <div class="chart-container-large"><canvas id="iv-chart"></canvas></div>
+            <div class="chart-container-large"><canvas id="iv-chart" width="1358" height="450"></canvas></div>
         </div>
         <div class="signals-card">
             <div class="signals-header">
@@ -268,7 +433,7 @@ DASHBOARD_HTML = '''
         </div>
         <div class="card" style="margin-bottom: 20px;">
             <h2 id="strike-chart-title">IV by Strike</h2>
-            <div class="chart-container"><canvas id="strike-chart"></canvas></div>
+            <div class="chart-container"><canvas id="strike-chart" width="1358" height="300"></canvas></div>
         </div>
         <div class="card">
             <div class="collapsible-header" onclick="toggleTable()">
@@ -277,6 +442,8 @@ DASHBOARD_HTML = '''
             </div>
             <div class="collapsible-content collapsed" id="table-collapsible">
                 <div id="table-container"><div class="loading">Loading...</div></div>
+                <template id="table-tpl"><table><thead><tr><th>Asset</th><th>Strike</th><th>Expiry</th><th>Type</th><th>IV</th><th>APY</th><th>Pricing</th></tr></thead><tbody></tbody></table></template>
+                <template id="row-tpl"><tr><td></td><td></td><td></td><td></td><td class="iv-value"></td><td></td><td></td></tr></template>
             </div>
         </div>
         <footer>
@@ -288,6 +455,8 @@ DASHBOARD_HTML = '''
         </footer>
     </div>
     <script>
+        // Chart.js is deferred; deferred scripts have run by DOMContentLoaded
+        const chartsReady = new Promise(resolve => document.addEventListener('DOMContentLoaded', resolve));
         let ivChart = null, strikeChart = null;
         let displayMode = 'iv'; // 'iv', 'apr', or 'svt'
         let showSpotOverlay = false;
@@ -332,6 +501,7 @@ DASHBOARD_HTML = '''
             if (forecastCache[asset]) return forecastCache[asset];
             try {
                 const resp = await fetch(`/api/forecasts/${asset}`);
+                if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
                 const data = await resp.json();
                 if (!data.length) console.log(`No forecast data for ${asset}. Run: python forecast_runner.py --seed-test`);
                 forecastCache[asset] = data;
@@ -365,33 +535,33 @@ DASHBOARD_HTML = '''
                     histDatasets.forEach(ds => {
                         const fc = fcGroups[ds.label];
                         if (!fc || !ds.data.length) return;
-                        const sorted = [...ds.data].sort((a, b) => a.x - b.x);
-                        const bridge = sorted[sorted.length - 1];
+                        // Series come from /api/iv in timestamp order; the last point is the latest
+                        const bridge = ds.data[ds.data.length - 1];
                         const color = ds.borderColor;
                         const isPut = (fc.option_type || '').toLowerCase() === 'put';
                         const strike = fc.points[0] ? parseFloat(fc.points[0].strike) : 0;
-                        const fcPoints = fc.points.filter(f => {
+                        const fcPoints = fc.points.map(f => {
                             // Exclude forecast points past the option's expiry
-                            const dte = f.expiry ? calcDTE(f.expiry, f.forecast_timestamp) : 0;
-                            return dte > 0;
-                        }).map(f => {
+                            const time = Date.parse(f.forecast_timestamp);
+                            const dte = f.expiry ? calcDTE(f.expiry, time) : 0;
+                            if (dte <= 0) return null;
                             let val = f.forecast_mid_iv;
-                            const dte = calcDTE(f.expiry, f.forecast_timestamp);
+                            const ctx = useApr && spot ? aprContext(strike, spot, dte) : null;
                             if (useSvt) {
                                 val = calcSigmaRootT(f.forecast_mid_iv, dte);
                             } else if (useApr && spot) {
-                                val = calcAprFromIV(f.forecast_mid_iv, strike, spot, dte, isPut);
+                                val = calcAprFromIV(f.forecast_mid_iv, strike, spot, dte, isPut, ctx);
                             }
                             let q10 = f.quantile_10, q90 = f.quantile_90;
                             if (useSvt) {
                                 q10 = q10 != null ? calcSigmaRootT(q10, dte) : null;
                                 q90 = q90 != null ? calcSigmaRootT(q90, dte) : null;
                             } else if (useApr && spot) {
-                                q10 = q10 != null ? calcAprFromIV(q10, strike, spot, dte, isPut) : null;
-                                q90 = q90 != null ? calcAprFromIV(q90, strike, spot, dte, isPut) : null;
+                                q10 = q10 != null ? calcAprFromIV(q10, strike, spot, dte, isPut, ctx) : null;
+                                q90 = q90 != null ? calcAprFromIV(q90, strike, spot, dte, isPut, ctx) : null;
                             }
-                            return { x: new Date(f.forecast_timestamp), y: val, q10, q90 };
-                        }).filter(p => p.y != null && !isNaN(p.y) && isFinite(p.y) && p.y > 0);
+                            return { x: time, y: val, q10, q90 };
+                        }).filter(p => p && p.y != null && !isNaN(p.y) && isFinite(p.y) && p.y > 0);
                         if (!fcPoints.length) return;
                         ivChart.data.datasets.push({
                             label: `${ds.label} forecast`,
@@ -434,7 +604,7 @@ DASHBOARD_HTML = '''
                 const resp = await fetch(`https://api.coingecko.com/api/v3/coins/${geckoId}/market_chart?vs_currency=usd&days=${days}`);
                 const data = await resp.json();
                 if (data.prices) {
-                    historicalSpotData[cacheKey] = data.prices.map(([ts, price]) => ({ x: new Date(ts), y: price }));
+                    historicalSpotData[cacheKey] = data.prices.map(([ts, price]) => ({ x: ts, y: price }));
                     return historicalSpotData[cacheKey];
                 }
             } catch (e) { console.log('Failed to fetch historical spot:', e); }
@@ -447,95 +617,72 @@ DASHBOARD_HTML = '''
             document.getElementById('mode-svt').classList.toggle('active', mode === 'svt');
             refresh();
         }
+        const expiryTimes = new Map();
         function calcDTE(expiry, timestamp) {
-            // Parse expiry like "13FEB26" to date
-            const months = {JAN:0,FEB:1,MAR:2,APR:3,MAY:4,JUN:5,JUL:6,AUG:7,SEP:8,OCT:9,NOV:10,DEC:11};
-            const day = parseInt(expiry.slice(0,2));
-            const mon = months[expiry.slice(2,5).toUpperCase()];
-            const yr = 2000 + parseInt(expiry.slice(5,7));
-            const expiryDate = new Date(yr, mon, day);
-            const dataDate = new Date(timestamp);
-            const dte = Math.max(0, (expiryDate - dataDate) / (1000 * 60 * 60 * 24));
-            return dte;
+            // Parse expiry like "13FEB26" to date, once per distinct expiry
+            let expiryTime = expiryTimes.get(expiry);
+            if (expiryTime === undefined) {
+                const months = {JAN:0,FEB:1,MAR:2,APR:3,MAY:4,JUN:5,JUL:6,AUG:7,SEP:8,OCT:9,NOV:10,DEC:11};
+                const day = parseInt(expiry.slice(0,2));
+                const mon = months[expiry.slice(2,5).toUpperCase()];
+                const yr = 2000 + parseInt(expiry.slice(5,7));
+                expiryTime = new Date(yr, mon, day).getTime();
+                expiryTimes.set(expiry, expiryTime);
+            }
+            const dataTime = typeof timestamp === 'number' ? timestamp : Date.parse(timestamp);
+            return Math.max(0, (expiryTime - dataTime) / (1000 * 60 * 60 * 24));
         }
         function calcSigmaRootT(iv, dte) {
             if (!dte || dte <= 0 || isNaN(dte) || !iv || isNaN(iv)) return 0;
             return iv * Math.sqrt(dte / 365);
         }
-        function calcAprFromIV(iv, strike, spot, dte, isPut) {
+        function annotateRecords(rows) {
+            // Parse time once per record; DTE and σ√T (d.dte, d.srt) come from the API
+            for (const d of rows) d._time = Date.parse(d.timestamp);
+        }
+        // Standard normal CDF via the Abramowitz-Stegun erf approximation
+        function erf(x) {
+            const sign = x < 0 ? -1 : 1;
+            const ax = x * sign;
+            const t = 1 / (1 + 0.3275911 * ax);
+            return sign * (1 - (((((1.061405429*t - 1.453152027)*t) + 1.421413741)*t - 0.284496736)*t + 0.254829592)*t*Math.exp(-ax*ax));
+        }
+        function normCDF(x) { return 0.5 * (1 + erf(x * Math.SQRT1_2)); }
+        function aprContext(strike, spot, dte) {
+            // Terms shared by every IV priced at one strike/spot/DTE (mid, q10, q90)
+            if (!strike || !spot || !dte || dte <= 0 || spot <= 0 || strike <= 0) return null;
+            const T = dte / 365;
+            return { strike, spot, dte, T, sqrtT: Math.sqrt(T), logSK: Math.log(spot / strike), discount: Math.exp(-0.05 * T) };
+        }
+        function calcAprFromIV(iv, strike, spot, dte, isPut, ctx) {
             // Black-Scholes forward pricing: IV -> option premium -> APR
-            if (!iv || !strike || !spot || !dte || dte <= 0 || spot <= 0 || strike <= 0) return null;
+            if (ctx === undefined) ctx = aprContext(strike, spot, dte);
+            if (!iv || !ctx) return null;
             const sigma = iv / 100;
-            const T = dte / 365;
-            const r = 0.05;
-            const d1 = (Math.log(spot / strike) + (r + 0.5 * sigma * sigma) * T) / (sigma * Math.sqrt(T));
-            const d2 = d1 - sigma * Math.sqrt(T);
-            // Standard normal CDF via error function approximation
-            function normCDF(x) { return 0.5 * (1 + erf(x / Math.SQRT2)); }
-            function erf(x) {
-                const a1=0.254829592, a2=-0.284496736, a3=1.421413741, a4=-1.453152027, a5=1.061405429, p=0.3275911;
-                const sign = x < 0 ? -1 : 1; x = Math.abs(x);
-                const t = 1 / (1 + p * x);
-                return sign * (1 - (((((a5*t+a4)*t)+a3)*t+a2)*t+a1)*t*Math.exp(-x*x));
-            }
+            const sigmaRootT = sigma * ctx.sqrtT;
+            const d1 = (ctx.logSK + (0.05 + 0.5 * sigma * sigma) * ctx.T) / sigmaRootT;
+            const d2 = d1 - sigmaRootT;
             let premium;
             if (isPut) {
-                premium = strike * Math.exp(-r * T) * normCDF(-d2) - spot * normCDF(-d1);
+                premium = ctx.strike * ctx.discount * normCDF(-d2) - ctx.spot * normCDF(-d1);
             } else {
-                premium = spot * normCDF(d1) - strike * Math.exp(-r * T) * normCDF(d2);
+                premium = ctx.spot * normCDF(d1) - ctx.strike * ctx.discount * normCDF(d2);
             }
             if (premium <= 0) return null;
-            const collateral = isPut ? strike : spot;
-            return (premium / collateral) * (365 / dte) * 100;
+            const collateral = isPut ? ctx.strike : ctx.spot;
+            return (premium / collateral) * (365 / ctx.dte) * 100;
         }
         async function updateSignals(asset) {
             const container = document.getElementById('signals-container');
             try {
-                // Fetch 7 days of data for percentile calculation
-                const ivData = await (await fetch(`/api/iv/${asset}?days=7`)).json();
-                if (!ivData.length) {
-                    container.innerHTML = '<div class="signal-item"><span class="signal-details">No data available</span></div>';
-                    return;
-                }
-                // Group by option (strike-expiry)
-                const options = {};
-                ivData.forEach(d => {
-                    if (!d.mid_iv || !d.expiry) return;
-                    const key = `${d.strike}-${d.expiry}`;
-                    const dte = calcDTE(d.expiry, d.timestamp);
-                    const srt = calcSigmaRootT(d.mid_iv, dte);
-                    if (srt > 0 && dte > 0) {
-                        if (!options[key]) options[key] = { points: [], strike: d.strike, expiry: d.expiry, type: d.option_type };
-                        options[key].points.push({ srt, iv: d.mid_iv, dte, timestamp: d.timestamp });
-                    }
-                });
-                // Calculate percentile for latest point of each option
-                const signals = [];
-                for (const [key, opt] of Object.entries(options)) {
-                    if (opt.points.length < 10) continue; // Need enough history
-                    const sorted = [...opt.points].sort((a, b) => new Date(a.timestamp) - new Date(b.timestamp));
-                    const latest = sorted[sorted.length - 1];
-                    const historical = sorted.slice(0, -1).map(p => p.srt);
-                    if (historical.length < 5) continue;
-                    // Calculate percentile
-                    const below = historical.filter(v => v < latest.srt).length;
-                    const pct = (below / historical.length) * 100;
-                    // Generate signal if extreme AND has enough DTE (14+ days works best)
-                    if (latest.dte < 7) continue; // Skip short-dated options
-                    const isLongDated = latest.dte >= 14;
-                    if (pct <= 10) {
-                        signals.push({ key, ...opt, latestSrt: latest.srt, latestIv: latest.iv, dte: latest.dte, pct, signal: 'BUY', winRate: isLongDated ? 63 : 51, isLongDated });
-                    } else if (pct >= 90) {
-                        signals.push({ key, ...opt, latestSrt: latest.srt, latestIv: latest.iv, dte: latest.dte, pct, signal: 'SELL', winRate: isLongDated ? 63 : 51, isLongDated });
-                    }
-                }
-                // Sort by: long-dated first, then SELL before BUY, then by extremity
-                signals.sort((a, b) => {
-                    if (a.isLongDated !== b.isLongDated) return a.isLongDated ? -1 : 1;
-                    if (a.signal === 'SELL' && b.signal === 'BUY') return -1;
-                    if (a.signal === 'BUY' && b.signal === 'SELL') return 1;
-                    return a.signal === 'SELL' ? b.pct - a.pct : a.pct - b.pct;
-                });
+                // Percentiles are computed server-side from the last 7 days
+                const rows = await (await fetch(`/api/signals/${asset}`)).json();
+                if (!Array.isArray(rows)) throw new Error(rows.error || 'Bad signals response');
+                const signals = rows.map(r => ({
+                    strike: r.strike, expiry: r.expiry, type: r.option_type, signal: r.signal,
+                    latestSrt: r.latest_srt, latestIv: r.latest_iv, dte: r.dte, pct: r.pct,
+                    isLongDated: r.is_long_dated, winRate: r.is_long_dated ? 63 : 51,
+                }));
                 if (signals.length === 0) {
                     container.innerHTML = '<div class="signal-item"><span class="signal-details">No extreme signals for ' + asset + ' - σ√T values are within normal range</span></div>';
                     return;
@@ -562,7 +709,19 @@ DASHBOARD_HTML = '''
                 container.innerHTML = '<div class="signal-item"><span class="signal-details">Error calculating signals</span></div>';
             }
         }
+        // Last CoinGecko response is kept in localStorage: fresh (<60s) entries skip the
+        // request, stale ones are used immediately while a background fetch updates them
         async function fetchSpotPrices() {
+            let cached = null;
+            try { cached = JSON.parse(localStorage.getItem('spotCache') || 'null'); } catch (e) {}
+            if (cached && cached.data) {
+                Object.assign(spotPrices, cached.data);
+                if (Date.now() - cached.t >= 60 * 1000) fetchSpotPricesRemote();
+                return;
+            }
+            await fetchSpotPricesRemote();
+        }
+        async function fetchSpotPricesRemote() {
             try {
                 const ids = Object.values(coinGeckoIds).join(',');
                 const resp = await fetch(`https://api.coingecko.com/api/v3/simple/price?ids=${ids}&vs_currencies=usd`);
@@ -570,6 +729,7 @@ DASHBOARD_HTML = '''
                 for (const [symbol, geckoId] of Object.entries(coinGeckoIds)) {
                     if (data[geckoId]) spotPrices[symbol] = data[geckoId].usd;
                 }
+                try { localStorage.setItem('spotCache', JSON.stringify({ t: Date.now(), data: spotPrices })); } catch (e) {}
             } catch (e) { console.log('Failed to fetch spot prices:', e); }
         }
         function toggleTable() {
@@ -583,46 +743,97 @@ DASHBOARD_HTML = '''
             refresh();
         }
         async function init() {
-            await fetchSpotPrices();
-            const assets = await (await fetch('/api/assets')).json();
+            const [, assets] = await Promise.all([
+                fetchSpotPrices(),
+                fetch('/api/assets').then(r => r.json())
+            ]);
             const sel = document.getElementById('asset-select');
             sel.innerHTML = assets.map(a => `<option value="${a}">${a}</option>`).join('');
             sel.onchange = refresh;
             document.getElementById('days-select').onchange = refresh;
-            await updateAggregatePricing();
             refresh();
-            // Auto-refresh every 5 minutes
+            // Auto-refresh every 5 minutes while the tab is visible; a tick skipped
+            // while hidden is made up once the tab comes back
+            let missedRefresh = false;
             setInterval(() => {
+                if (document.hidden) { missedRefresh = true; return; }
                 refresh();
                 fetchSpotPrices();
             }, 5 * 60 * 1000);
-        }
-        async function updateAggregatePricing() {
-            const allData = await (await fetch('/api/latest')).json();
-            const byAsset = {};
-            const now = new Date();
-            const oneDayAgo = new Date(now - 24 * 60 * 60 * 1000);
-            allData.forEach(d => {
-                if (!byAsset[d.asset]) byAsset[d.asset] = { pcts: [], latestTime: null };
-                if (d.iv_percentile !== null) byAsset[d.asset].pcts.push(d.iv_percentile);
-                const ts = new Date(d.timestamp);
-                if (!byAsset[d.asset].latestTime || ts > byAsset[d.asset].latestTime) byAsset[d.asset].latestTime = ts;
+            document.addEventListener('visibilitychange', () => {
+                if (document.hidden || !missedRefresh) return;
+                missedRefresh = false;
+                refresh();
+                fetchSpotPrices();
             });
+        }
+        // /api/pricing doesn't depend on the selected asset or range, so asset/days
+        // changes within a minute reuse the last render instead of refetching
+        let pricingCache = { time: 0, promise: null };
+        function updateAggregatePricing() {
+            if (pricingCache.promise && Date.now() - pricingCache.time < 60 * 1000) return pricingCache.promise;
+            const promise = renderAggregatePricing();
+            pricingCache = { time: Date.now(), promise };
+            promise.catch(() => { pricingCache.time = 0; });
+            return promise;
+        }
+        // Asset cards are built once per asset and updated in place on later renders;
+        // clicks are handled by one delegated listener on the container
+        const assetCards = new Map();
+        function assetCard(asset) {
+            let card = assetCards.get(asset);
+            if (card) return card;
+            const el = document.createElement('div');
+            el.className = 'asset-card';
+            el.dataset.asset = asset;
+            const nameEl = document.createElement('div');
+            nameEl.className = 'asset-name';
+            nameEl.textContent = asset;
+            if (coveredCallOnly.includes(asset)) {
+                const badge = document.createElement('span');
+                badge.style.cssText = 'font-size:10px;background:#30363d;padding:2px 5px;border-radius:3px;margin-left:5px;';
+                badge.textContent = 'CC';
+                nameEl.appendChild(badge);
+            }
+            const pricingEl = document.createElement('div');
+            const pctEl = document.createElement('div');
+            pctEl.className = 'asset-pct';
+            el.append(nameEl, pricingEl, pctEl);
+            card = { el, pricingEl, pctEl };
+            assetCards.set(asset, card);
+            return card;
+        }
+        async function renderAggregatePricing() {
+            const pricingData = await (await fetch('/api/pricing')).json();
+            const oneDayAgo = Date.now() - 24 * 60 * 60 * 1000;
             const container = document.getElementById('aggregate-pricing');
-            const cards = Object.entries(byAsset).map(([asset, { pcts, latestTime }]) => {
-                const isActive = latestTime && latestTime > oneDayAgo;
-                const isCCOnly = coveredCallOnly.includes(asset);
-                const ccBadge = isCCOnly ? '<span style="font-size:10px;background:#30363d;padding:2px 5px;border-radius:3px;margin-left:5px;">CC</span>' : '';
-                if (!isActive) return `<div class="asset-card inactive" onclick="selectAsset('${asset}')"><div class="asset-name">${asset}${ccBadge}</div><div class="asset-pricing inactive">NOT ACTIVE</div></div>`;
-                if (pcts.length === 0) return `<div class="asset-card" onclick="selectAsset('${asset}')"><div class="asset-name">${asset}${ccBadge}</div><div class="asset-pricing fair">NO DATA</div></div>`;
-                const avgPct = pcts.reduce((a,b) => a+b, 0) / pcts.length;
-                let pricing, pricingClass;
-                if (avgPct >= 75) { pricing = 'EXPENSIVE'; pricingClass = 'expensive'; }
-                else if (avgPct <= 25) { pricing = 'CHEAP'; pricingClass = 'cheap'; }
-                else { pricing = 'FAIR'; pricingClass = 'fair'; }
-                return `<div class="asset-card" onclick="selectAsset('${asset}')"><div class="asset-name">${asset}${ccBadge}</div><div class="asset-pricing ${pricingClass}">${pricing}</div><div class="asset-pct">Avg ${avgPct.toFixed(0)}th percentile</div></div>`;
+            if (!container.onclick) container.onclick = e => {
+                const el = e.target.closest('.asset-card');
+                if (el) selectAsset(el.dataset.asset);
+            };
+            const els = pricingData.map(({ asset, avg_percentile, pricing, latest_timestamp }) => {
+                const isActive = latest_timestamp && Date.parse(latest_timestamp) > oneDayAgo;
+                const { el, pricingEl, pctEl } = assetCard(asset);
+                el.classList.toggle('inactive', !isActive);
+                const label = !isActive ? 'NOT ACTIVE' : avg_percentile === null ? 'NO DATA' : pricing;
+                const cls = !isActive ? 'inactive' : avg_percentile === null ? 'fair' : pricing.toLowerCase();
+                if (pricingEl.textContent !== label) pricingEl.textContent = label;
+                pricingEl.className = `asset-pricing ${cls}`;
+                pctEl.hidden = !isActive || avg_percentile === null;
+                if (!pctEl.hidden) pctEl.textContent = `Avg ${avg_percentile.toFixed(0)}th percentile`;
+                return el;
             });
-            container.innerHTML = cards.join('');
+            const kids = container.children;
+            if (els.length !== kids.length || els.some((el, i) => kids[i] !== el)) container.replaceChildren(...els);
+        }
+        // Only the previously and newly selected cards change class
+        let selectedAssetEl = null;
+        function markSelectedAsset(asset) {
+            const next = assetCards.has(asset) ? assetCards.get(asset).el : null;
+            if (next === selectedAssetEl) return;
+            if (selectedAssetEl) selectedAssetEl.classList.remove('selected');
+            if (next) next.classList.add('selected');
+            selectedAssetEl = next;
         }
         async function refresh() {
             try {
@@ -644,81 +855,121 @@ DASHBOARD_HTML = '''
                         infoTooltip.innerHTML = '<strong>IV (Implied Volatility)</strong><br><br>The market expected price movement:<br>• Higher IV = larger expected moves<br>• IV typically rises before events<br>• Use σ√T mode to see premium impact';
                     }
                 }
-                const [ivRes, latestRes] = await Promise.all([
-                    fetch(`/api/iv/${asset}?days=${days}`),
-                    fetch(`/api/latest?asset=${asset}`)
+                // Issue all requests up front so they run concurrently; the small
+                // summary fills the stat tiles while the full series is still loading
+                fetch(`/api/iv/${asset}/summary?days=${days}`).then(r => r.json()).then(updateStats)
+                    .catch(e => console.error('Summary error:', e));
+                const [ivData, latestData] = await Promise.all([
+                    fetch(`/api/iv/${asset}?days=${days}`).then(r => r.json()),
+                    fetch(`/api/latest?asset=${asset}`).then(r => r.json()),
+                    updateAggregatePricing()
                 ]);
-                const [ivData, latestData] = await Promise.all([ivRes.json(), latestRes.json()]);
-                await updateAggregatePricing();
                 updateSignals(asset);
-            document.querySelectorAll('.asset-card').forEach(card => {
-                card.classList.toggle('selected', card.querySelector('.asset-name').textContent === asset);
-            });
-            document.getElementById('stat-records').textContent = ivData.length;
-            document.getElementById('stat-avg-label').textContent = displayMode === 'apr' ? 'Avg APR' : displayMode === 'svt' ? 'Avg σ√T' : 'Avg IV';
-            if (ivData.length > 0) {
-                let avgValue;
-                if (displayMode === 'svt') {
-                    const srtValues = ivData.filter(d => d.mid_iv != null && d.expiry).map(d => calcSigmaRootT(d.mid_iv, calcDTE(d.expiry, d.timestamp))).filter(v => !isNaN(v) && isFinite(v));
-                    avgValue = srtValues.length > 0 ? srtValues.reduce((s, v) => s + v, 0) / srtValues.length : 0;
-                } else {
-                    const valueKey = displayMode === 'apr' ? 'apy' : 'mid_iv';
-                    const validData = ivData.filter(d => d[valueKey] != null);
-                    avgValue = validData.length > 0 ? validData.reduce((s,d) => s + d[valueKey], 0) / validData.length : 0;
-                }
-                document.getElementById('stat-avg-iv').textContent = avgValue.toFixed(1) + (displayMode === 'svt' ? '' : '%');
-                document.getElementById('stat-updated').textContent = new Date(ivData[ivData.length-1].timestamp).toLocaleTimeString();
-            }
+                annotateRecords(ivData);
+                annotateRecords(latestData);
+            markSelectedAsset(asset);
             await updateCharts(ivData, latestData, asset);
             updateTable(latestData);
             } catch (e) { console.error('Refresh error:', e); }
         }
+        function updateStats(summary) {
+            document.getElementById('stat-records').textContent = summary.n || 0;
+            document.getElementById('stat-avg-label').textContent = displayMode === 'apr' ? 'Avg APR' : displayMode === 'svt' ? 'Avg σ√T' : 'Avg IV';
+            if (summary.n > 0) {
+                const avgValue = (displayMode === 'apr' ? summary.avg_apy : displayMode === 'svt' ? summary.avg_srt : summary.avg_iv) || 0;
+                document.getElementById('stat-avg-iv').textContent = avgValue.toFixed(1) + (displayMode === 'svt' ? '' : '%');
+                document.getElementById('stat-updated').textContent = new Date(summary.last_ts).toLocaleTimeString();
+            }
+        }
+        // Top-10 line colors; the forecast bands use the same colors at 0x20 alpha
+        const colors = ['#58a6ff','#3fb950','#f85149','#a371f7','#f0883e','#79c0ff','#56d364','#ff7b72','#d2a8ff','#ffa657'];
+        const colorsAlpha = colors.map(c => c + '20');
+        let chartPointCache = { scope: null, lines: new Map() };
         async function updateCharts(ivData, latestData, asset) {
+            await chartsReady;
             const useApr = displayMode === 'apr';
             const useSvt = displayMode === 'svt';
             const yAxisLabel = useApr ? 'APR %' : useSvt ? 'σ√T' : 'IV %';
 
             const ctx1 = document.getElementById('iv-chart').getContext('2d');
             const groups = {};
+            // /api/iv is ordered by timestamp, so each group's points stay time-sorted
             ivData.forEach(d => {
                 let val;
                 if (useSvt) {
-                    if (d.mid_iv != null && d.expiry) {
-                        const dte = calcDTE(d.expiry, d.timestamp);
-                        val = calcSigmaRootT(d.mid_iv, dte);
-                    }
+                    val = d.srt;
                 } else {
                     val = useApr ? d.apy : d.mid_iv;
                 }
                 if (val != null && !isNaN(val) && isFinite(val) && val > 0) {
+                    // Parallel time/value arrays per option; the max is tracked as points arrive
                     const k = `${d.strike}-${d.expiry}`;
-                    if (!groups[k]) groups[k] = [];
-                    groups[k].push({...d, displayValue: val});
+                    let g = groups[k];
+                    if (!g) g = groups[k] = { times: [], vals: [], maxVal: -Infinity, strike: parseFloat(d.strike) };
+                    g.times.push(d._time);
+                    g.vals.push(val);
+                    if (val > g.maxVal) g.maxVal = val;
                 }
             });
-            // Sort by recency first (markets with recent quotes), then by max value
-            const now = new Date();
-            const sorted = Object.entries(groups).map(([k, pts]) => {
-                const latestTime = Math.max(...pts.map(p => new Date(p.timestamp).getTime()));
+            // Rank by recency first (markets with recent quotes), then by max value
+            const now = Date.now();
+            const markets = Object.entries(groups).map(([k, g]) => {
+                const latestTime = g.times[g.times.length - 1];
                 const hoursAgo = (now - latestTime) / (1000 * 60 * 60);
                 const isRecent = hoursAgo < 24;
-                return { k, pts, maxVal: Math.max(...pts.map(p => p.displayValue)), strike: parseFloat(k.split('-')[0]), latestTime, isRecent };
-            }).sort((a, b) => {
+                return { k, g, maxVal: g.maxVal, strike: g.strike, latestTime, isRecent };
+            });
+            const rank = (a, b) => {
                 // Prioritize recent markets, then sort by max value
                 if (a.isRecent !== b.isRecent) return a.isRecent ? -1 : 1;
                 return b.maxVal - a.maxVal;
-            });
-            const top10 = sorted.slice(0, 10).sort((a, b) => a.strike - b.strike);
-            const othersCount = sorted.length - 10;
-            const colors = ['#58a6ff','#3fb950','#f85149','#a371f7','#f0883e','#79c0ff','#56d364','#ff7b72','#d2a8ff','#ffa657'];
-            const datasets = top10.map(({k, pts}, i) => ({
-                label: k, data: pts.map(p => ({x: new Date(p.timestamp), y: p.displayValue})),
+            };
+            // Keep only the best 10 in insertion order instead of sorting every market;
+            // ties keep the earlier market, as the stable sort did
+            const best = [];
+            for (const m of markets) {
+                if (best.length === 10 && rank(m, best[9]) >= 0) continue;
+                let i = Math.min(best.length, 9);
+                if (best.length < 10) best.push(m);
+                while (i > 0 && rank(m, best[i - 1]) < 0) { best[i] = best[i - 1]; i--; }
+                best[i] = m;
+            }
+            const top10 = best.sort((a, b) => a.strike - b.strike);
+            const othersCount = markets.length - top10.length;
+            const toPoints = (g, out = []) => {
+                for (let j = 0; j < g.times.length; j++) out.push({x: g.times[j], y: g.vals[j]});
+                return out;
+            };
+            // Top-10 point arrays persist across refreshes: points that slid out of the
+            // window are dropped from the front and only newer quotes are appended
+            const cacheScope = `${asset}|${document.getElementById('days-select').value}|${displayMode}`;
+            if (chartPointCache.scope !== cacheScope) chartPointCache = { scope: cacheScope, lines: new Map() };
+            const lines = new Map();
+            const cachedPoints = (k, g) => {
+                const c = chartPointCache.lines.get(k);
+                if (!c || !g.times.length) return { data: toPoints(g), lastTs: g.times[g.times.length - 1] };
+                let drop = 0;
+                while (drop < c.data.length && c.data[drop].x < g.times[0]) drop++;
+                if (drop) c.data.splice(0, drop);
+                let j = g.times.length;
+                while (j > 0 && g.times[j - 1] > c.lastTs) j--;
+                if (c.data.length !== j || (j && c.data[0].x !== g.times[0])) return { data: toPoints(g), lastTs: g.times[g.times.length - 1] };
+                for (; j < g.times.length; j++) c.data.push({x: g.times[j], y: g.vals[j]});
+                c.lastTs = g.times[g.times.length - 1];
+                return c;
+            };
+            top10.forEach(({k, g}) => lines.set(k, cachedPoints(k, g)));
+            chartPointCache.lines = lines;
+            const datasets = top10.map(({k, g}, i) => ({
+                label: k, data: lines.get(k).data,
                 borderColor: colors[i], backgroundColor: colors[i],
                 borderWidth: 2, pointRadius: 0, pointHoverRadius: 4, tension: 0.1
             }));
             // Add "other markets" as a single combined indicator if there are more
             if (othersCount > 0) {
-                const otherData = sorted.slice(10).flatMap(({pts}) => pts.map(p => ({x: new Date(p.timestamp), y: p.displayValue})));
+                const inTop = new Set(top10);
+                const otherData = [];
+                markets.forEach(m => { if (!inTop.has(m)) toPoints(m.g, otherData); });
                 datasets.push({ label: `Other markets (${othersCount})`, data: otherData, borderColor: '#6e7681', backgroundColor: '#6e7681', borderWidth: 1, pointRadius: 0, pointHoverRadius: 2, tension: 0.1, hidden: true, yAxisID: 'y' });
             }
             // Add spot price overlay if enabled
@@ -726,9 +977,11 @@ DASHBOARD_HTML = '''
                 x: { type: 'time', time: { unit: 'day', displayFormats: { day: 'MMM d' } }, title: { display: true, text: 'Date', color: '#8b949e' }, grid: { color: '#21262d' }, ticks: { color: '#8b949e' } },
                 y: { position: 'left', title: { display: true, text: yAxisLabel, color: '#8b949e' }, grid: { color: '#21262d' }, ticks: { color: '#8b949e' } }
             };
+            // Start both overlay fetches before awaiting either
+            const spotPromise = showSpotOverlay ? fetchHistoricalSpot(asset, document.getElementById('days-select').value) : null;
+            const fcPromise = showForecast ? fetchForecastData(asset) : null;
             if (showSpotOverlay) {
-                const days = document.getElementById('days-select').value;
-                const spotData = await fetchHistoricalSpot(asset, days);
+                const spotData = await spotPromise;
                 if (spotData.length > 0) {
                     datasets.unshift({ label: `${asset} Spot Price`, data: spotData, borderColor: '#f0883e', backgroundColor: 'rgba(240,136,62,0.1)', borderWidth: 2, pointRadius: 0, pointHoverRadius: 4, tension: 0.1, fill: true, yAxisID: 'y1' });
                     scales.y1 = { position: 'right', title: { display: true, text: 'Spot Price ($)', color: '#f0883e' }, grid: { drawOnChartArea: false }, ticks: { color: '#f0883e' } };
@@ -736,7 +989,7 @@ DASHBOARD_HTML = '''
             }
             // Add forecast overlay if enabled
             if (showForecast) {
-                const fcData = await fetchForecastData(asset);
+                const fcData = await fcPromise;
                 if (fcData.length > 0) {
                     // Group forecasts by strike-expiry
                     const fcGroups = {};
@@ -747,39 +1000,38 @@ DASHBOARD_HTML = '''
                     });
                     // For each top-10 historical line, add matching forecast
                     const spot = spotPrices[asset];
-                    top10.forEach(({k, pts}, i) => {
+                    top10.forEach(({k, g}, i) => {
                         const fc = fcGroups[k];
                         if (!fc) return;
-                        // Get last historical point as bridge
-                        const lastHistPt = pts.sort((a,b) => new Date(a.timestamp) - new Date(b.timestamp));
-                        const bridge = lastHistPt[lastHistPt.length - 1];
-                        const bridgeVal = bridge.displayValue;
-                        const bridgeTime = new Date(bridge.timestamp);
+                        // Get last historical point as bridge (groups keep /api/iv timestamp order)
+                        const last = g.times.length - 1;
+                        const bridgeVal = g.vals[last];
+                        const bridgeTime = g.times[last];
                         const isPut = (fc.option_type || '').toLowerCase() === 'put';
                         const strike = fc.points[0] ? parseFloat(fc.points[0].strike) : 0;
                         // Transform forecast values based on display mode
                         // Filter out forecast points past the option's expiry
-                        const fcPoints = fc.points.filter(f => {
-                            const dte = f.expiry ? calcDTE(f.expiry, f.forecast_timestamp) : 0;
-                            return dte > 0;
-                        }).map(f => {
+                        const fcPoints = fc.points.map(f => {
+                            const time = Date.parse(f.forecast_timestamp);
+                            const dte = f.expiry ? calcDTE(f.expiry, time) : 0;
+                            if (dte <= 0) return null;
                             let val = f.forecast_mid_iv;
-                            const dte = calcDTE(f.expiry, f.forecast_timestamp);
+                            const ctx = useApr && spot ? aprContext(strike, spot, dte) : null;
                             if (useSvt) {
                                 val = calcSigmaRootT(f.forecast_mid_iv, dte);
                             } else if (useApr && spot) {
-                                val = calcAprFromIV(f.forecast_mid_iv, strike, spot, dte, isPut);
+                                val = calcAprFromIV(f.forecast_mid_iv, strike, spot, dte, isPut, ctx);
                             }
                             let q10 = f.quantile_10, q90 = f.quantile_90;
                             if (useSvt) {
                                 q10 = q10 != null ? calcSigmaRootT(q10, dte) : null;
                                 q90 = q90 != null ? calcSigmaRootT(q90, dte) : null;
                             } else if (useApr && spot) {
-                                q10 = q10 != null ? calcAprFromIV(q10, strike, spot, dte, isPut) : null;
-                                q90 = q90 != null ? calcAprFromIV(q90, strike, spot, dte, isPut) : null;
+                                q10 = q10 != null ? calcAprFromIV(q10, strike, spot, dte, isPut, ctx) : null;
+                                q90 = q90 != null ? calcAprFromIV(q90, strike, spot, dte, isPut, ctx) : null;
                             }
-                            return { x: new Date(f.forecast_timestamp), y: val, q10, q90 };
-                        }).filter(p => p.y != null && !isNaN(p.y) && isFinite(p.y) && p.y > 0);
+                            return { x: time, y: val, q10, q90 };
+                        }).filter(p => p && p.y != null && !isNaN(p.y) && isFinite(p.y) && p.y > 0);
                         if (!fcPoints.length) return;
                         // Bridge: prepend last historical point
                         const bridgedData = [{ x: bridgeTime, y: bridgeVal }, ...fcPoints];
@@ -812,7 +1064,7 @@ DASHBOARD_HTML = '''
                                 label: `${k} q90`,
                                 data: bandUpper,
                                 borderColor: 'transparent',
-                                backgroundColor: colors[i] + '20',
+                                backgroundColor: colorsAlpha[i],
                                 borderWidth: 0,
                                 pointRadius: 0,
                                 fill: false,
@@ -825,7 +1077,7 @@ DASHBOARD_HTML = '''
                                 label: `${k} q10`,
                                 data: bandLower,
                                 borderColor: 'transparent',
-                                backgroundColor: colors[i] + '20',
+                                backgroundColor: colorsAlpha[i],
                                 borderWidth: 0,
                                 pointRadius: 0,
                                 fill: '-1',
@@ -839,44 +1091,86 @@ DASHBOARD_HTML = '''
             }
             // Set yAxisID for all other datasets
             datasets.forEach(ds => { if (!ds.yAxisID) ds.yAxisID = 'y'; });
-            if (ivChart) ivChart.destroy();
-            ivChart = new Chart(ctx1, { type: 'line', data: { datasets }, options: { responsive: true, maintainAspectRatio: false, interaction: { mode: 'nearest', intersect: false }, scales, plugins: { legend: { position: 'bottom', labels: { color: '#8b949e', usePointStyle: true, pointStyle: 'line', font: { size: 11 }, padding: 10, boxWidth: 25, filter: function(item, chart) { const ds = chart.datasets[item.datasetIndex]; return !ds._isForecastBand; } } } } } });
+            // Reuse the chart across refreshes; swapping data keeps its scales, legend and canvas
+            if (ivChart) {
+                ivChart.data.datasets = datasets;
+                ivChart.options.scales = scales;
+                ivChart.update('none');
+            } else ivChart = new Chart(ctx1, { type: 'line', data: { datasets }, options: { responsive: true, maintainAspectRatio: false, interaction: { mode: 'nearest', intersect: false }, scales, plugins: { legend: { position: 'bottom', labels: { color: '#8b949e', usePointStyle: true, pointStyle: 'line', font: { size: 11 }, padding: 10, boxWidth: 25, filter: function(item, chart) { const ds = chart.datasets[item.datasetIndex]; return !ds._isForecastBand; } } } } } });
 
             const ctx2 = document.getElementById('strike-chart').getContext('2d');
             const strikeData = {};
             latestData.forEach(d => {
                 let val;
                 if (useSvt) {
-                    if (d.mid_iv != null && d.expiry) {
-                        const dte = calcDTE(d.expiry, d.timestamp);
-                        val = calcSigmaRootT(d.mid_iv, dte);
-                    }
+                    val = d.srt;
                 } else {
                     val = useApr ? d.apy : d.mid_iv;
                 }
                 if (val != null && !isNaN(val) && isFinite(val) && val > 0) {
-                    if (!strikeData[d.strike]) strikeData[d.strike] = [];
-                    strikeData[d.strike].push(val);
+                    // Running sum/count per strike; no per-strike value arrays to reduce later
+                    const acc = strikeData[d.strike];
+                    if (acc) { acc.sum += val; acc.n++; } else strikeData[d.strike] = { sum: val, n: 1 };
                 }
             });
             const strikes = Object.keys(strikeData).sort((a,b) => a-b);
-            const avgValues = strikes.map(s => strikeData[s].reduce((a,b)=>a+b,0)/strikeData[s].length);
+            const avgValues = strikes.map(s => strikeData[s].sum / strikeData[s].n);
             const spotPrice = spotPrices[asset];
             let closestIdx = -1;
-            if (spotPrice) {
-                let minDiff = Infinity;
-                strikes.forEach((s, i) => { const diff = Math.abs(parseFloat(s) - spotPrice); if (diff < minDiff) { minDiff = diff; closestIdx = i; } });
+            if (spotPrice && strikes.length) {
+                // strikes are sorted numerically: binary search for the first strike >= spot,
+                // then take the nearer neighbour (the lower one on a tie)
+                const strikesF = Float64Array.from(strikes, Number);
+                let lo = 0, hi = strikesF.length;
+                while (lo < hi) { const mid = (lo + hi) >> 1; if (strikesF[mid] < spotPrice) lo = mid + 1; else hi = mid; }
+                if (lo === strikesF.length) closestIdx = lo - 1;
+                else if (lo > 0 && spotPrice - strikesF[lo - 1] <= strikesF[lo] - spotPrice) closestIdx = lo - 1;
+                else closestIdx = lo;
             }
             const barColors = strikes.map((_, i) => i === closestIdx ? '#f0883e' : '#58a6ff');
             const labels = strikes.map((s, i) => i === closestIdx ? `${s} (spot)` : s);
-            if (strikeChart) strikeChart.destroy();
-            strikeChart = new Chart(ctx2, { type: 'bar', data: { labels: labels, datasets: [{ label: yAxisLabel, data: avgValues, backgroundColor: barColors }] }, options: { responsive: true, maintainAspectRatio: false, scales: { x: { grid: { color: '#21262d' }, ticks: { color: '#8b949e' } }, y: { grid: { color: '#21262d' }, ticks: { color: '#8b949e' } } }, plugins: { legend: { display: false } } } });
+            if (strikeChart) {
+                strikeChart.data.labels = labels;
+                strikeChart.data.datasets = [{ label: yAxisLabel, data: avgValues, backgroundColor: barColors }];
+                strikeChart.update('none');
+            } else strikeChart = new Chart(ctx2, { type: 'bar', data: { labels: labels, datasets: [{ label: yAxisLabel, data: avgValues, backgroundColor: barColors }] }, options: { responsive: true, maintainAspectRatio: false, scales: { x: { grid: { color: '#21262d' }, ticks: { color: '#8b949e' } }, y: { grid: { color: '#21262d' }, ticks: { color: '#8b949e' } } }, plugins: { legend: { display: false } } } });
         }
         function updateTable(data) {
-            if (!data.length) { document.getElementById('table-container').innerHTML = '<div class="loading">No data</div>'; return; }
+            const container = document.getElementById('table-container');
+            if (!data.length) { container.innerHTML = '<div class="loading">No data</div>'; return; }
             const pricingClass = p => p === 'EXPENSIVE' ? 'pricing-expensive' : p === 'CHEAP' ? 'pricing-cheap' : 'pricing-fair';
-            const pricingLabel = d => d.pricing ? `<span class="${pricingClass(d.pricing)}">${d.pricing}</span>${d.iv_percentile !== null ? ` <small>(${d.iv_percentile.toFixed(0)}%ile)</small>` : ''}` : '<span class="pricing-na">-</span>';
-            document.getElementById('table-container').innerHTML = `<table><thead><tr><th>Asset</th><th>Strike</th><th>Expiry</th><th>Type</th><th>IV</th><th>APY</th><th>Pricing</th></tr></thead><tbody>${data.map(d => `<tr><td>${d.asset}</td><td>${d.strike}</td><td>${d.expiry}</td><td>${d.option_type||'-'}</td><td class="iv-value">${d.mid_iv?d.mid_iv.toFixed(2)+'%':'-'}</td><td>${d.apy?d.apy.toFixed(2)+'%':'-'}</td><td>${pricingLabel(d)}</td></tr>`).join('')}</tbody></table>`;
+            // Clone template rows and fill cells as text, so no HTML is parsed per row
+            const table = document.getElementById('table-tpl').content.firstElementChild.cloneNode(true);
+            const rowTpl = document.getElementById('row-tpl').content.firstElementChild;
+            const frag = document.createDocumentFragment();
+            for (const d of data) {
+                const row = rowTpl.cloneNode(true);
+                const cells = row.cells;
+                cells[0].textContent = d.asset;
+                cells[1].textContent = d.strike;
+                cells[2].textContent = d.expiry;
+                cells[3].textContent = d.option_type || '-';
+                cells[4].textContent = d.mid_iv ? d.mid_iv.toFixed(2) + '%' : '-';
+                cells[5].textContent = d.apy ? d.apy.toFixed(2) + '%' : '-';
+                const label = document.createElement('span');
+                if (d.pricing) {
+                    label.className = pricingClass(d.pricing);
+                    label.textContent = d.pricing;
+                    cells[6].appendChild(label);
+                    if (d.iv_percentile != null) {
+                        const pct = document.createElement('small');
+                        pct.textContent = `(${d.iv_percentile.toFixed(0)}%ile)`;
+                        cells[6].append(' ', pct);
+                    }
+                } else {
+                    label.className = 'pricing-na';
+                    label.textContent = '-';
+                    cells[6].appendChild(label);
+                }
+                frag.appendChild(row);
+            }
+            table.tBodies[0].appendChild(frag);
+            container.replaceChildren(table);
         }
         function openModal() { document.getElementById('methodology-modal').classList.add('active'); }
         function closeModal() { document.getElementById('methodology-modal').classList.remove('active'); }
@@ -941,8 +1235,8 @@ ACTIVITY_HTML = '''
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Rysk On-Chain Activity</title>
     <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🍪</text></svg>">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/chartjs-adapter-date-fns"></script>
+    <script defer src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <script defer src="https://cdn.jsdelivr.net/npm/chartjs-adapter-date-fns"></script>
     <style>
         * { margin: 0; padding: 0; box-sizing: border-box; }
         body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #0d1117; color: #c9d1d9; min-height: 100vh; padding: 20px; }
@@ -958,6 +1252,8 @@ ACTIVITY_HTML = '''
         .card h2 { font-size: 16px; margin-bottom: 15px; color: #8b949e; }
         .chart-container { position: relative; height: 300px; }
         .chart-container-large { position: relative; height: 450px; }
+        /* Canvases carry their desktop backing size as attributes; CSS keeps them in the box until Chart.js sizes them */
+        .chart-container canvas, .chart-container-large canvas { display: block; width: 100%; height: 100%; }
         .grid { display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin-bottom: 20px; }
         @media (max-width: 900px) { .grid { grid-template-columns: 1fr; } }
         .stats { display: grid; grid-template-columns: repeat(3, 1fr); gap: 15px; margin-bottom: 20px; }
@@ -977,6 +1273,10 @@ ACTIVITY_HTML = '''
         .experimental-toggle input { cursor: pointer; }
         .heatmap { display: grid; grid-template-columns: 50px repeat(24, 1fr); gap: 2px; }
         .heatmap-cell { aspect-ratio: 1; border-radius: 3px; display: flex; align-items: center; justify-content: center; font-size: 10px; cursor: default; min-height: 24px; }
+        /* Intensity buckets: h0 = no trades, h1..h10 = 0.15 + 0.85 x (count / max) */
+        .heatmap-cell.h0 { background: #161b22; }
+        .heatmap-cell.h1 { background: rgba(88,166,255,0.235); } .heatmap-cell.h2 { background: rgba(88,166,255,0.32); } .heatmap-cell.h3 { background: rgba(88,166,255,0.405); } .heatmap-cell.h4 { background: rgba(88,166,255,0.49); } .heatmap-cell.h5 { background: rgba(88,166,255,0.575); }
+        .heatmap-cell.h6 { background: rgba(88,166,255,0.66); } .heatmap-cell.h7 { background: rgba(88,166,255,0.745); } .heatmap-cell.h8 { background: rgba(88,166,255,0.83); } .heatmap-cell.h9 { background: rgba(88,166,255,0.915); } .heatmap-cell.h10 { background: rgba(88,166,255,1); }
         .heatmap-label { font-size: 11px; color: #8b949e; display: flex; align-items: center; justify-content: center; }
         .heatmap-header { font-size: 10px; color: #8b949e; text-align: center; }
         .tag-put { color: #f85149; }
@@ -1027,21 +1327,21 @@ ACTIVITY_HTML = '''
         </div>
         <div class="card" style="margin-bottom: 20px;">
             <h2>Volume Over Time</h2>
-            <div class="chart-container-large"><canvas id="volume-chart"></canvas></div>
+            <div class="chart-container-large"><canvas id="volume-chart" width="1358" height="450"></canvas></div>
         </div>
         <div class="grid">
             <div class="card">
                 <h2>Premium Distribution</h2>
-                <div class="chart-container"><canvas id="premium-chart"></canvas></div>
+                <div class="chart-container"><canvas id="premium-chart" width="648" height="300"></canvas></div>
             </div>
             <div class="card">
                 <h2>Popular Strikes</h2>
-                <div class="chart-container"><canvas id="strikes-chart"></canvas></div>
+                <div class="chart-container"><canvas id="strikes-chart" width="648" height="300"></canvas></div>
             </div>
         </div>
         <div class="card" style="margin-bottom: 20px;">
             <h2>IV at Trade Time vs Current IV</h2>
-            <div class="chart-container-large"><canvas id="correlation-chart"></canvas></div>
+            <div class="chart-container-large"><canvas id="correlation-chart" width="1358" height="450"></canvas></div>
         </div>
         <div class="card" style="margin-bottom: 20px;">
             <h2>Activity Heatmap (UTC)</h2>
@@ -1066,28 +1366,54 @@ ACTIVITY_HTML = '''
             if (!on) window.location.href = '/';
         }
         let volumeChart = null, premiumChart = null, strikesChart = null, correlationChart = null;
+        // Last input each chart was drawn from; an identical refresh skips the redraw
+        const chartInputs = {};
+        function unchanged(name, data) {
+            const sig = JSON.stringify(data);
+            if (chartInputs[name] === sig) return true;
+            chartInputs[name] = sig;
+            return false;
+        }
+        // Swap new data into an existing chart instead of destroying and rebuilding it
+        function drawChart(chart, ctx, config) {
+            if (!chart) return new Chart(ctx, config);
+            chart.data.labels = config.data.labels;
+            chart.data.datasets = config.data.datasets;
+            chart.update('none');
+            return chart;
+        }
         const assetColors = {'BTC': '#f7931a', 'HYPE': '#58a6ff', 'ETH': '#627eea', 'SOL': '#00ffa3', 'XRP': '#23292f', 'HYPE': '#a371f7'};
 
+        // Chart.js is deferred; deferred scripts have run by DOMContentLoaded
+        const chartsReady = new Promise(resolve => document.addEventListener('DOMContentLoaded', resolve));
+
+        function debounce(fn, ms) {
+            let t;
+            return (...args) => { clearTimeout(t); t = setTimeout(() => fn(...args), ms); };
+        }
+
         async function init() {
-            document.getElementById('asset-filter').onchange = refresh;
-            document.getElementById('days-select').onchange = refresh;
+            // Arrowing through a select fires change per option; only the last one refreshes
+            document.getElementById('asset-filter').onchange = debounce(refresh, 200);
+            document.getElementById('days-select').onchange = debounce(refresh, 200);
             await refresh();
             setInterval(refresh, 15 * 60 * 1000);
         }
 
+        // A new refresh cancels the previous one's request and rendering
+        let refreshController = null;
         async function refresh() {
             const asset = document.getElementById('asset-filter').value;
             const days = document.getElementById('days-select').value;
             const params = `asset=${asset}&days=${days}`;
+            if (refreshController) refreshController.abort();
+            const controller = refreshController = new AbortController();
             try {
-                const [stats, volume, positions, heatmap, strikes, correlation] = await Promise.all([
-                    fetch(`/api/activity/stats?${params}`).then(r => r.json()),
-                    fetch(`/api/activity/volume?${params}`).then(r => r.json()),
-                    fetch(`/api/activity/positions?${params}&limit=50`).then(r => r.json()),
-                    fetch(`/api/activity/heatmap?${params}`).then(r => r.json()),
-                    fetch(`/api/activity/strikes?${params}`).then(r => r.json()),
-                    fetch(`/api/activity/correlation?${params}`).then(r => r.json()),
-                ]);
+                // One request for all six datasets instead of six function invocations
+                const { stats, volume, positions, heatmap, strikes, correlation } =
+                    await fetch(`/api/activity/all?${params}&limit=50`, { signal: controller.signal }).then(r => r.json());
+                await chartsReady;
+                if (controller.signal.aborted) return;
                 updateStats(stats);
                 updateVolumeChart(volume);
                 updatePremiumChart(positions);
@@ -1095,7 +1421,7 @@ ACTIVITY_HTML = '''
                 updateCorrelationChart(correlation);
                 updateHeatmap(heatmap);
                 updatePositionsTable(positions);
-            } catch (e) { console.error('Refresh error:', e); }
+            } catch (e) { if (e.name !== 'AbortError') console.error('Refresh error:', e); }
         }
 
         function updateStats(data) {
@@ -1105,24 +1431,20 @@ ACTIVITY_HTML = '''
             document.getElementById('stat-premium').textContent = prem >= 1000 ? '$' + (prem/1000).toFixed(1) + 'k' : '$' + prem.toFixed(2);
         }
 
-        function updateVolumeChart(data) {
+        function updateVolumeChart(volume) {
+            if (unchanged('volume', volume)) return;
+            const { dates, assets, premium, counts } = volume;
+            // The server sends the volume already pivoted onto one date axis
             const ctx = document.getElementById('volume-chart').getContext('2d');
-            const dates = [...new Set(data.map(d => d.date))].sort();
-            const assets = [...new Set(data.map(d => d.asset))];
             const datasets = assets.map(asset => ({
                 label: asset,
-                data: dates.map(date => {
-                    const entry = data.find(d => d.date === date && d.asset === asset);
-                    return entry ? entry.total_premium : 0;
-                }),
+                data: premium[asset],
                 backgroundColor: assetColors[asset] || '#8b949e',
                 stack: 'premium',
             }));
-            const countByDate = {};
-            data.forEach(d => { countByDate[d.date] = (countByDate[d.date] || 0) + d.trade_count; });
             datasets.push({
                 label: 'Trade Count',
-                data: dates.map(d => countByDate[d] || 0),
+                data: counts,
                 type: 'line',
                 borderColor: '#f0883e',
                 backgroundColor: 'transparent',
@@ -1130,8 +1452,7 @@ ACTIVITY_HTML = '''
                 tension: 0.2,
                 pointRadius: 3,
             });
-            if (volumeChart) volumeChart.destroy();
-            volumeChart = new Chart(ctx, {
+            volumeChart = drawChart(volumeChart, ctx, {
                 type: 'bar',
                 data: { labels: dates, datasets },
                 options: {
@@ -1147,10 +1468,10 @@ ACTIVITY_HTML = '''
         }
 
         function updatePremiumChart(positions) {
+            if (unchanged('premium', positions)) return;
             const ctx = document.getElementById('premium-chart').getContext('2d');
-            if (!positions.length) { if (premiumChart) premiumChart.destroy(); return; }
             const premiums = positions.filter(p => p.premium_amount > 0).map(p => p.premium_amount);
-            if (!premiums.length) { if (premiumChart) premiumChart.destroy(); return; }
+            if (!premiums.length) { if (premiumChart) premiumChart.destroy(); premiumChart = null; return; }
             const maxP = Math.max(...premiums);
             const bucketCount = 10;
             const bucketSize = maxP / bucketCount;
@@ -1164,8 +1485,7 @@ ACTIVITY_HTML = '''
                 const hi = ((i + 1) * bucketSize).toFixed(1);
                 return `${lo}-${hi}`;
             });
-            if (premiumChart) premiumChart.destroy();
-            premiumChart = new Chart(ctx, {
+            premiumChart = drawChart(premiumChart, ctx, {
                 type: 'bar',
                 data: { labels, datasets: [{ label: 'Positions', data: buckets, backgroundColor: '#58a6ff' }] },
                 options: {
@@ -1180,14 +1500,14 @@ ACTIVITY_HTML = '''
         }
 
         function updateStrikesChart(data) {
+            if (unchanged('strikes', data)) return;
             const ctx = document.getElementById('strikes-chart').getContext('2d');
-            if (!data.length) { if (strikesChart) strikesChart.destroy(); return; }
+            if (!data.length) { if (strikesChart) strikesChart.destroy(); strikesChart = null; return; }
             const top = data.slice(0, 15);
             const labels = top.map(d => `${d.strike} ${d.expiry} ${d.is_put ? 'P' : 'C'}`);
             const counts = top.map(d => d.count);
             const premiums = top.map(d => d.total_premium || 0);
-            if (strikesChart) strikesChart.destroy();
-            strikesChart = new Chart(ctx, {
+            strikesChart = drawChart(strikesChart, ctx, {
                 type: 'bar',
                 data: {
                     labels,
@@ -1208,7 +1528,19 @@ ACTIVITY_HTML = '''
             });
         }
 
+        // Map of key -> mapped items, in first-seen key order
+        function groupBy(arr, keyFn, mapFn = x => x) {
+            const groups = new Map();
+            for (const item of arr) {
+                const k = keyFn(item);
+                const group = groups.get(k);
+                if (group) group.push(mapFn(item)); else groups.set(k, [mapFn(item)]);
+            }
+            return groups;
+        }
+
         function updateCorrelationChart(data) {
+            if (unchanged('correlation', data)) return;
             const ctx = document.getElementById('correlation-chart').getContext('2d');
             const valid = data.filter(d => d.trade_iv != null && d.current_iv != null);
             if (!valid.length) {
@@ -1220,21 +1552,22 @@ ACTIVITY_HTML = '''
                 ctx.fillText('No correlation data available yet', ctx.canvas.width / 2, ctx.canvas.height / 2);
                 return;
             }
-            const byAsset = {};
-            valid.forEach(d => {
-                if (!byAsset[d.asset]) byAsset[d.asset] = [];
-                byAsset[d.asset].push({ x: d.trade_iv, y: d.current_iv });
+            // One pass groups points by asset and tracks the IV range for the diagonal
+            let lo = Infinity, hi = -Infinity;
+            const byAsset = groupBy(valid, d => d.asset, d => {
+                lo = Math.min(lo, d.trade_iv, d.current_iv);
+                hi = Math.max(hi, d.trade_iv, d.current_iv);
+                return { x: d.trade_iv, y: d.current_iv };
             });
-            const datasets = Object.entries(byAsset).map(([asset, points]) => ({
+            const datasets = [...byAsset].map(([asset, points]) => ({
                 label: asset,
                 data: points,
                 backgroundColor: assetColors[asset] || '#8b949e',
                 pointRadius: 5,
                 pointHoverRadius: 7,
             }));
-            const allIVs = valid.flatMap(d => [d.trade_iv, d.current_iv]);
-            const minIV = Math.min(...allIVs) * 0.9;
-            const maxIV = Math.max(...allIVs) * 1.1;
+            const minIV = lo * 0.9;
+            const maxIV = hi * 1.1;
             datasets.push({
                 label: 'No Change Line',
                 data: [{ x: minIV, y: minIV }, { x: maxIV, y: maxIV }],
@@ -1245,8 +1578,7 @@ ACTIVITY_HTML = '''
                 pointRadius: 0,
                 showLine: true,
             });
-            if (correlationChart) correlationChart.destroy();
-            correlationChart = new Chart(ctx, {
+            correlationChart = drawChart(correlationChart, ctx, {
                 type: 'scatter',
                 data: { datasets },
                 options: {
@@ -1272,11 +1604,11 @@ ACTIVITY_HTML = '''
         function updateHeatmap(data) {
             const container = document.getElementById('heatmap-container');
             const days = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
-            const counts = {};
+            // Dense day-of-week x hour grid instead of string-keyed lookups
+            const counts = new Int32Array(7 * 24);
             let maxCount = 0;
             data.forEach(d => {
-                const key = `${d.dow}-${d.hour}`;
-                counts[key] = d.count;
+                counts[d.dow * 24 + d.hour] = d.count;
                 if (d.count > maxCount) maxCount = d.count;
             });
             if (maxCount === 0) {
@@ -1289,10 +1621,9 @@ ACTIVITY_HTML = '''
             for (let d = 0; d < 7; d++) {
                 html += `<div class="heatmap-label">${days[d]}</div>`;
                 for (let h = 0; h < 24; h++) {
-                    const count = counts[`${d}-${h}`] || 0;
-                    const intensity = count / maxCount;
-                    const bg = count > 0 ? `rgba(88,166,255,${0.15 + intensity * 0.85})` : '#161b22';
-                    html += `<div class="heatmap-cell" style="background:${bg}" title="${days[d]} ${h}:00 UTC - ${count} trades">${count || ''}</div>`;
+                    const count = counts[d * 24 + h];
+                    const bucket = count > 0 ? Math.max(1, Math.round(count / maxCount * 10)) : 0;
+                    html += `<div class="heatmap-cell h${bucket}" title="${days[d]} ${h}:00 UTC - ${count} trades">${count || ''}</div>`;
                 }
             }
             html += '</div>';
@@ -1324,113 +1655,241 @@ ACTIVITY_HTML = '''
 '''
 
 
+_pool = None
+_pool_lock = threading.Lock()
+# ThreadedConnectionPool raises instead of waiting when it is empty, so borrowers
+# take a slot first; connections opened outside the pool are tracked here
+_pool_slots = threading.BoundedSemaphore(PG_POOL_MAX)
+_unpooled_conns = set()
+
+
+def connect_kwargs():
+    """psycopg2.connect options shared by pooled and one-off connections."""
+    # TCP keepalives let a thawed instance notice dead sockets quickly
+    kwargs = dict(cursor_factory=RealDictCursor, keepalives=1, keepalives_idle=30,
+                  keepalives_interval=10, keepalives_count=3)
+    # The transaction pooler rejects startup options, so there the
+    # timeout has to be set on the database role instead
+    if not PG_TRANSACTION_POOLER:
+        kwargs['options'] = f'-c statement_timeout={PG_STATEMENT_TIMEOUT_MS}'
+    return kwargs
+
+
+def get_pool():
+    """Get the shared connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if not DATABASE_URL:
+                    raise Exception("DATABASE_URL not configured")
+                _pool = ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, dsn=DATABASE_URL, **connect_kwargs())
+    return _pool
+
+
+def acquire_conn():
+    """Take a pooled connection, waiting up to PG_POOL_WAIT for one to free up.
+
+    If the pool stays exhausted, open a one-off connection rather than fail.
+    """
+    pool = get_pool()
+    if _pool_slots.acquire(timeout=PG_POOL_WAIT):
+        try:
+            return pool.getconn()
+        except Exception:
+            _pool_slots.release()
+            raise
+    conn = psycopg2.connect(DATABASE_URL, **connect_kwargs())
+    _unpooled_conns.add(conn)
+    return conn
+
+
+def release_conn(conn, close=False):
+    """Return a connection from acquire_conn; one-off connections are closed."""
+    if conn in _unpooled_conns:
+        _unpooled_conns.discard(conn)
+        conn.close()
+        return
+    try:
+        get_pool().putconn(conn, close=close)
+    finally:
+        _pool_slots.release()
+
+
+@contextmanager
 def get_db():
-    """Get database connection."""
-    if not DATABASE_URL:
-        raise Exception("DATABASE_URL not configured")
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+    """Borrow a pooled database connection; it is returned to the pool on exit.
+
+    Inside a request the connection is kept on g and shared by every get_db()
+    in that request, then returned once by release_request_db.
+    """
+    scoped = has_request_context()
+    started = time.perf_counter()
+    conn = g.get('db_conn') if scoped else None
+    if conn is not None and (conn.closed or g.get('db_broken')):
+        # An earlier block lost the connection; swap in a fresh one
+        g.pop('db_conn')
+        release_conn(conn, close=True)
+        g.db_broken = False
+        conn = None
+    if conn is None:
+        conn = acquire_conn()
+        if scoped:
+            g.db_conn = conn
+    broken = False
+    try:
+        yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        # Drop connections the server has closed (e.g. after an idle freeze)
+        broken = True
+        raise
+    except Exception:
+        # Don't hand an aborted transaction to the next block in this request
+        if scoped and not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        if scoped:
+            g.db_broken = g.get('db_broken', False) or broken
+            g.db_time = g.get('db_time', 0.0) + time.perf_counter() - started
+        else:
+            release_conn(conn, close=broken or bool(conn.closed))
+
+
+@app.teardown_request
+def release_request_db(exc):
+    """Return the request's shared connection to the pool."""
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        release_conn(conn, close=g.pop('db_broken', False) or bool(conn.closed))
+
+
+def borrow_db(conn=None):
+    """Reuse a caller's connection if given, otherwise borrow one from the pool."""
+    return nullcontext(conn) if conn is not None else get_db()
 
 
 def init_db():
     """Initialize database schema."""
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS iv_snapshots (
-            id SERIAL PRIMARY KEY,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            asset TEXT NOT NULL,
-            strike REAL NOT NULL,
-            expiry TEXT NOT NULL,
-            bid_iv REAL,
-            ask_iv REAL,
-            mid_iv REAL,
-            option_type TEXT,
-            apy REAL
-        )
-    """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_asset_time ON iv_snapshots(asset, timestamp)")
-    # Also ensure iv_forecasts table exists (populated by forecast_runner.py)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS iv_forecasts (
-            id SERIAL PRIMARY KEY,
-            generated_at TIMESTAMP NOT NULL,
-            asset TEXT NOT NULL,
-            strike REAL NOT NULL,
-            expiry TEXT NOT NULL,
-            option_type TEXT,
-            forecast_timestamp TIMESTAMP NOT NULL,
-            forecast_mid_iv REAL NOT NULL,
-            quantile_10 REAL,
-            quantile_90 REAL,
-            model_version TEXT DEFAULT 'timesfm-2.5-200m'
-        )
-    """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_forecasts_asset_gen ON iv_forecasts(asset, generated_at)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_forecasts_lookup ON iv_forecasts(asset, strike, expiry, generated_at DESC)")
-    conn.commit()
-    conn.close()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS iv_snapshots (
+                id SERIAL PRIMARY KEY,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                asset TEXT NOT NULL,
+                strike REAL NOT NULL,
+                expiry TEXT NOT NULL,
+                bid_iv REAL,
+                ask_iv REAL,
+                mid_iv REAL,
+                option_type TEXT,
+                apy REAL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_asset_time ON iv_snapshots(asset, timestamp)")
+        # Serves DISTINCT ON (asset, strike, expiry) ... ORDER BY timestamp DESC and
+        # the per-option 7-day history range in /api/latest
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_iv_key_time_desc ON iv_snapshots(asset, strike, expiry, timestamp DESC)")
+        # /api/latest and /api/pricing read this; save_records refreshes it after each scrape.
+        # The view is tagged with a hash of LATEST_SQL so edits to the query rebuild it
+        # (CREATE ... IF NOT EXISTS alone would keep the old definition forever)
+        cursor.execute("SELECT obj_description(to_regclass('iv_latest_mv'), 'pg_class') as version")
+        if cursor.fetchone()['version'] != LATEST_SQL_VERSION:
+            cursor.execute("SET LOCAL statement_timeout = 0")
+            cursor.execute("DROP MATERIALIZED VIEW IF EXISTS iv_latest_mv")
+            cursor.execute(f"CREATE MATERIALIZED VIEW iv_latest_mv AS {LATEST_SQL}")
+            # Unique key required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+            cursor.execute("CREATE UNIQUE INDEX iv_latest_mv_pk ON iv_latest_mv(asset, strike, expiry)")
+            cursor.execute(f"COMMENT ON MATERIALIZED VIEW iv_latest_mv IS '{LATEST_SQL_VERSION}'")
+        # Also ensure iv_forecasts table exists (populated by forecast_runner.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS iv_forecasts (
+                id SERIAL PRIMARY KEY,
+                generated_at TIMESTAMP NOT NULL,
+                asset TEXT NOT NULL,
+                strike REAL NOT NULL,
+                expiry TEXT NOT NULL,
+                option_type TEXT,
+                forecast_timestamp TIMESTAMP NOT NULL,
+                forecast_mid_iv REAL NOT NULL,
+                quantile_10 REAL,
+                quantile_90 REAL,
+                model_version TEXT DEFAULT 'timesfm-2.5-200m'
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_forecasts_asset_gen ON iv_forecasts(asset, generated_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_forecasts_lookup ON iv_forecasts(asset, strike, expiry, generated_at DESC)")
+        conn.commit()
+
+    if NUMBA_AVAILABLE:
+        # Compile (or load from cache) the IV kernel before the first scrape needs it
+        calculate_ivs_from_apy([100.0], [100.0], [30], [10.0], [False])
 
 
 def init_activity_db():
     """Initialize on-chain activity database schema."""
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS indexer_state (
-            contract_address TEXT PRIMARY KEY,
-            last_block BIGINT NOT NULL DEFAULT 0,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS onchain_positions (
-            id SERIAL PRIMARY KEY,
-            tx_hash TEXT UNIQUE NOT NULL,
-            block_number BIGINT NOT NULL,
-            block_timestamp TIMESTAMP,
-            user_address TEXT NOT NULL,
-            asset TEXT NOT NULL,
-            strike REAL NOT NULL,
-            expiry TEXT NOT NULL,
-            is_put BOOLEAN NOT NULL,
-            collateral_amount REAL,
-            collateral_token TEXT,
-            premium_amount REAL,
-            fee_amount REAL,
-            otoken_amount REAL,
-            otoken_address TEXT
-        )
-    """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_asset_time ON onchain_positions(asset, block_timestamp)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_user ON onchain_positions(user_address)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_timestamp ON onchain_positions(block_timestamp)")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS otoken_registry (
-            otoken_address TEXT PRIMARY KEY,
-            underlying TEXT,
-            strike REAL,
-            expiry TEXT,
-            expiry_timestamp BIGINT,
-            is_put BOOLEAN,
-            collateral TEXT,
-            asset TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS indexer_state (
+                contract_address TEXT PRIMARY KEY,
+                last_block BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS onchain_positions (
+                id SERIAL PRIMARY KEY,
+                tx_hash TEXT UNIQUE NOT NULL,
+                block_number BIGINT NOT NULL,
+                block_timestamp TIMESTAMP,
+                user_address TEXT NOT NULL,
+                asset TEXT NOT NULL,
+                strike REAL NOT NULL,
+                expiry TEXT NOT NULL,
+                is_put BOOLEAN NOT NULL,
+                collateral_amount REAL,
+                collateral_token TEXT,
+                premium_amount REAL,
+                fee_amount REAL,
+                otoken_amount REAL,
+                otoken_address TEXT
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_asset_time ON onchain_positions(asset, block_timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_user ON onchain_positions(user_address)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_timestamp ON onchain_positions(block_timestamp)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS otoken_registry (
+                otoken_address TEXT PRIMARY KEY,
+                underlying TEXT,
+                strike REAL,
+                expiry TEXT,
+                expiry_timestamp BIGINT,
+                is_put BOOLEAN,
+                collateral TEXT,
+                asset TEXT
+            )
+        """)
+        conn.commit()
 
 
 # ============== RPC Helpers ==============
 
 _last_rpc_call = 0
 
+# Keep-alive session for HyperEVM; calls stay sequential (see min_gap below)
+# and are never retried, but skip a TCP+TLS handshake each time
+RPC_SESSION = requests.Session()
+RPC_SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
 
 _indexer_deadline = None
 
 
-def rpc_call(method, params=None):
-    """Make a JSON-RPC call to HyperEVM. No retries - fail fast for Vercel."""
+def rpc_post(payload, timeout=5):
+    """POST a JSON-RPC body to HyperEVM, spaced out to respect the rate limit."""
     global _last_rpc_call
     if _indexer_deadline and time.time() > _indexer_deadline:
         raise Exception("time budget exceeded")
@@ -1441,13 +1900,18 @@ def rpc_call(method, params=None):
         time.sleep(min_gap - elapsed)
     _last_rpc_call = time.time()
 
-    resp = requests.post(HYPERVM_RPC, json={
+    resp = RPC_SESSION.post(HYPERVM_RPC, json=payload, timeout=timeout)
+    return orjson.loads(resp.content)
+
+
+def rpc_call(method, params=None):
+    """Make a JSON-RPC call to HyperEVM. No retries - fail fast for Vercel."""
+    result = rpc_post({
         'jsonrpc': '2.0',
         'method': method,
         'params': params or [],
         'id': 1,
-    }, timeout=5)
-    result = resp.json()
+    })
     if 'error' in result:
         raise Exception(f"RPC error: {result['error']}")
     return result.get('result')
@@ -1469,6 +1933,40 @@ def get_logs(from_block, to_block, address, topics):
     }]) or []
 
 
+def rpc_batch(method, params_list):
+    """Make several calls of one method in a single batched JSON-RPC request.
+
+    Results come back in request order. Any per-call error fails the whole
+    batch so the caller can fall back to individual calls.
+    """
+    result = rpc_post([{
+        'jsonrpc': '2.0',
+        'method': method,
+        'params': params,
+        'id': i,
+    } for i, params in enumerate(params_list)], timeout=6)
+    if not isinstance(result, list):
+        raise Exception(f"RPC error: {result.get('error', 'batch not supported')}")
+    result.sort(key=lambda r: r.get('id', 0))
+    for r in result:
+        if 'error' in r:
+            raise Exception(f"RPC error: {r['error']}")
+    if len(result) != len(params_list):
+        raise Exception("RPC error: incomplete batch response")
+    return [r.get('result') for r in result]
+
+
+def get_logs_batch(windows, address, topics):
+    """Get logs for several (from_block, to_block) windows in one request."""
+    results = rpc_batch('eth_getLogs', [[{
+        'address': address,
+        'topics': topics,
+        'fromBlock': hex(from_block),
+        'toBlock': hex(to_block),
+    }] for from_block, to_block in windows])
+    return [log for logs in results for log in (logs or [])]
+
+
 def get_receipt(tx_hash):
     """Get transaction receipt."""
     return rpc_call('eth_getTransactionReceipt', [tx_hash])
@@ -1482,19 +1980,31 @@ def get_block_timestamp(block_number):
     return None
 
 
+def get_block_timestamps(block_numbers):
+    """Get {block_number: timestamp} for several blocks, RPC_BATCH_SIZE per request."""
+    block_numbers = list(block_numbers)
+    timestamps = {}
+    for i in range(0, len(block_numbers), RPC_BATCH_SIZE):
+        chunk = block_numbers[i:i + RPC_BATCH_SIZE]
+        blocks = rpc_batch('eth_getBlockByNumber', [[hex(b), False] for b in chunk])
+        for block_number, block in zip(chunk, blocks):
+            if block and 'timestamp' in block:
+                timestamps[block_number] = int(block['timestamp'], 16)
+    return timestamps
+
+
 # ============== ABI Decode Helpers ==============
 
 def decode_address(topic_hex):
     """Decode an address from a 32-byte hex topic."""
-    h = topic_hex.replace('0x', '')
-    return '0x' + h[-40:]
+    return '0x' + topic_hex[-40:]
 
 
 def decode_uint256(data_hex, offset=0):
     """Decode a uint256 from data at given 32-byte word offset."""
-    h = data_hex.replace('0x', '')
-    start = offset * 64
-    return int(h[start:start + 64], 16)
+    # Slice the word in place rather than copying the whole payload without its prefix
+    start = offset * 64 + (2 if data_hex.startswith('0x') else 0)
+    return int(data_hex[start:start + 64], 16)
 
 
 def decode_bool(data_hex, offset=0):
@@ -1519,55 +2029,67 @@ def token_to_asset(address):
 _otoken_cache = {}
 
 
+def rollback_borrowed(conn):
+    """Clear an aborted transaction on a caller's connection after a swallowed error."""
+    if conn is not None and not conn.closed:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            pass
+
+
 def get_otoken_info(otoken_address, conn=None):
     """Get otoken info from cache or DB."""
     addr = otoken_address.lower()
     if addr in _otoken_cache:
         return _otoken_cache[addr]
     try:
-        close_conn = False
-        if conn is None:
-            conn = get_db()
-            close_conn = True
-        try:
-            cursor = conn.cursor()
+        with borrow_db(conn) as db:
+            cursor = db.cursor()
             cursor.execute("SELECT * FROM otoken_registry WHERE otoken_address = %s", (addr,))
             row = cursor.fetchone()
             if row:
-                info = dict(row)
-                _otoken_cache[addr] = info
-                return info
-        finally:
-            if close_conn:
-                conn.close()
+                # RealDictRow is already a dict; cache it as-is
+                _otoken_cache[addr] = row
+                return row
     except Exception:
-        pass
+        rollback_borrowed(conn)
     return None
 
 
+def get_otoken_infos(otoken_addresses, conn=None):
+    """Load registry rows for several otokens into the cache in one query."""
+    missing = list({a.lower() for a in otoken_addresses} - _otoken_cache.keys())
+    if not missing:
+        return
+    try:
+        with borrow_db(conn) as db:
+            cursor = db.cursor()
+            cursor.execute("SELECT * FROM otoken_registry WHERE otoken_address = ANY(%s)", (missing,))
+            for row in cursor.fetchall():
+                _otoken_cache[row['otoken_address']] = row
+    except Exception:
+        # Rolled back so the caller's connection stays usable; uncached
+        # otokens are then looked up one at a time by get_otoken_info
+        rollback_borrowed(conn)
+
+
 def save_otoken_info(otoken_address, info, conn=None):
     """Save otoken info to DB and cache."""
     addr = otoken_address.lower()
     _otoken_cache[addr] = info
     try:
-        close_conn = False
-        if conn is None:
-            conn = get_db()
-            close_conn = True
-        try:
-            cursor = conn.cursor()
+        with borrow_db(conn) as db:
+            cursor = db.cursor()
             cursor.execute("""
                 INSERT INTO otoken_registry (otoken_address, underlying, strike, expiry, expiry_timestamp, is_put, collateral, asset)
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                 ON CONFLICT (otoken_address) DO NOTHING
             """, (addr, info.get('underlying'), info['strike'], info['expiry'],
                   info.get('expiry_timestamp'), info['is_put'], info.get('collateral'), info['asset']))
-            conn.commit()
-        finally:
-            if close_conn:
-                conn.close()
+            db.commit()
     except Exception:
-        pass  # Cache-only mode when DB unavailable
+        rollback_borrowed(conn)  # Cache-only mode when DB unavailable
 
 
 # Symbol prefix -> asset name mapping
@@ -1581,7 +2103,17 @@ def query_otoken_onchain(otoken_address):
     """Query otoken contract on-chain for its properties via name() and strikePrice()."""
     addr = otoken_address.lower()
     # name() = 0x06fdde03 - returns ABI-encoded string like "UETHUSDC 20-February-2026 1750Put USDC Collateral"
-    name_result = rpc_call('eth_call', [{'to': addr, 'data': '0x06fdde03'}, 'latest'])
+    # strikePrice() = 0xc52987cf
+    name_call = [{'to': addr, 'data': '0x06fdde03'}, 'latest']
+    strike_call = [{'to': addr, 'data': '0xc52987cf'}, 'latest']
+    # Both calls go out in one batched request, falling back to two plain calls
+    # when the node rejects or truncates the batch
+    try:
+        name_result, strike_result = rpc_batch('eth_call', [name_call, strike_call])
+    except Exception as e:
+        log.warning("Batched eth_call failed for %s, retrying individually: %s", addr, e)
+        name_result = rpc_call('eth_call', name_call)
+        strike_result = rpc_call('eth_call', strike_call)
     if not name_result or len(name_result) < 130:
         return None
     # Decode ABI string
@@ -1589,8 +2121,6 @@ def query_otoken_onchain(otoken_address):
     str_len = int(data_hex[64:128], 16)
     name_str = bytes.fromhex(data_hex[128:128 + str_len * 2]).decode('utf-8', errors='replace')
 
-    # strikePrice() = 0xc52987cf
-    strike_result = rpc_call('eth_call', [{'to': addr, 'data': '0xc52987cf'}, 'latest'])
     if not strike_result:
         return None
     strike = int(strike_result, 16) / 1e8
@@ -1667,12 +2197,13 @@ def decode_position_from_receipt(receipt, conn=None):
         topics = log.get('topics', [])
         if not topics:
             continue
-        topic0 = topics[0].lower()
-        addr = log.get('address', '').lower()
+        kind = EVENT_KINDS.get((topics[0].lower(), log.get('address', '').lower()))
+        if kind is None:
+            continue
         data = log.get('data', '0x')
 
         # OtokenCreated from OtokenFactory
-        if topic0 == TOPIC_OTOKEN_CREATED.lower() and addr == OTOKEN_FACTORY.lower():
+        if kind == 'otoken_created':
             if len(topics) < 4:
                 continue
             underlying = decode_address(topics[1])
@@ -1702,7 +2233,7 @@ def decode_position_from_receipt(receipt, conn=None):
             }
 
         # ShortOtokenMinted from Controller
-        elif topic0 == TOPIC_SHORT_OTOKEN_MINTED.lower() and addr == CONTROLLER_CONTRACT.lower():
+        elif kind == 'short_minted':
             if len(topics) < 4:
                 continue
             otoken_addr = decode_address(topics[1])
@@ -1712,29 +2243,29 @@ def decode_position_from_receipt(receipt, conn=None):
             position['otoken_amount'] = amount / 1e8
 
         # CollateralAssetDeposited from Controller
-        elif topic0 == TOPIC_COLLATERAL_DEPOSITED.lower() and addr == CONTROLLER_CONTRACT.lower():
+        elif kind == 'collateral_deposited':
             if len(topics) < 4:
                 continue
-            asset_addr = decode_address(topics[1])
+            asset_addr = decode_address(topics[1]).lower()
             amount = decode_uint256(data, 1)  # data[0]=vaultId, data[1]=amount
 
-            token = TOKEN_INFO.get(asset_addr.lower())
+            token = TOKEN_INFO.get(asset_addr)
             if token:
-                position['collateral_amount'] = amount / (10 ** token['decimals'])
+                position['collateral_amount'] = amount / TOKEN_SCALE[asset_addr]
                 position['collateral_token'] = token['symbol']
 
         # TransferToUser from Rysk MarginPool
-        elif topic0 == TOPIC_TRANSFER_TO_USER.lower() and addr == RYSK_MARGIN_POOL.lower():
+        elif kind == 'transfer_to_user':
             if len(topics) < 4:
                 continue
             asset_addr = decode_address(topics[1])
             to_addr = decode_address(topics[3])
             amount = decode_uint256(data, 0)
 
-            token = TOKEN_INFO.get(asset_addr.lower())
-            if token:
-                scaled = amount / (10 ** token['decimals'])
-                if to_addr.lower() == FEE_RECIPIENT.lower():
+            scale = TOKEN_SCALE.get(asset_addr.lower())
+            if scale:
+                scaled = amount / scale
+                if to_addr.lower() == FEE_RECIPIENT_LC:
                     position['fee_amount'] = (position.get('fee_amount') or 0) + scaled
                 else:
                     position['premium_amount'] = (position.get('premium_amount') or 0) + scaled
@@ -1776,6 +2307,11 @@ def decode_position_from_receipt(receipt, conn=None):
 
 # ============== Indexer ==============
 
+# Last block this instance committed to indexer_state, reused by warm invocations
+_indexer_cursor = {'block': None, 'ts': 0}
+INDEXER_CURSOR_TTL = 60  # seconds before re-reading the cursor from Postgres
+
+
 def index_activity_batch(max_blocks=None):
     """Index a batch of blocks for on-chain activity."""
     global _indexer_deadline
@@ -1783,130 +2319,185 @@ def index_activity_batch(max_blocks=None):
     if max_blocks is None:
         max_blocks = MAX_BLOCKS_PER_CRON
 
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Get last indexed block
-    cursor.execute("SELECT last_block FROM indexer_state WHERE contract_address = %s",
-                   (CONTROLLER_CONTRACT.lower(),))
-    row = cursor.fetchone()
-
-    if row:
-        last_block = max(row['last_block'], ACTIVITY_START_BLOCK)
-    else:
-        last_block = ACTIVITY_START_BLOCK
-        cursor.execute(
-            "INSERT INTO indexer_state (contract_address, last_block) VALUES (%s, %s)",
-            (CONTROLLER_CONTRACT.lower(), last_block))
-        conn.commit()
+    with get_db() as conn:
+        cursor = conn.cursor()
 
-    try:
-        current_block = get_block_number()
-    except Exception:
-        # If rate limited on first call, estimate current block far ahead
-        current_block = last_block + max_blocks
-    from_block = last_block + 1
-    to_block = min(from_block + max_blocks - 1, current_block)
+        # Get last indexed block; a recent cursor from this instance skips the read
+        if (_indexer_cursor['block'] is not None
+                and time.time() - _indexer_cursor['ts'] < INDEXER_CURSOR_TTL):
+            row = {'last_block': _indexer_cursor['block']}
+        else:
+            cursor.execute("SELECT last_block FROM indexer_state WHERE contract_address = %s",
+                           (CONTROLLER_CONTRACT.lower(),))
+            row = cursor.fetchone()
 
-    if from_block > current_block:
-        conn.close()
-        return {'from_block': from_block, 'to_block': to_block,
-                'positions_found': 0, 'blocks_remaining': 0, 'status': 'caught_up'}
-
-    positions_found = 0
-    processed_tx_hashes = set()
-    block_timestamps = {}
-    start_time = time.time()
-
-    scan_from = from_block
-    while scan_from <= to_block:
-        # Stop before Vercel function timeout
-        if time.time() - start_time > INDEXER_TIME_BUDGET:
-            to_block = scan_from - 1
-            break
-        scan_to = min(scan_from + LOGS_BLOCK_RANGE - 1, to_block)
+        if row:
+            last_block = max(row['last_block'], ACTIVITY_START_BLOCK)
+        else:
+            last_block = ACTIVITY_START_BLOCK
+            cursor.execute(
+                "INSERT INTO indexer_state (contract_address, last_block) VALUES (%s, %s)",
+                (CONTROLLER_CONTRACT.lower(), last_block))
+            conn.commit()
 
         try:
-            logs = get_logs(scan_from, scan_to, CONTROLLER_CONTRACT,
-                          [TOPIC_SHORT_OTOKEN_MINTED])
-        except Exception as e:
-            err_msg = str(e).lower()
-            if 'time budget' in err_msg:
+            current_block = get_block_number()
+        except Exception:
+            # If rate limited on first call, estimate current block far ahead
+            current_block = last_block + max_blocks
+        from_block = last_block + 1
+        to_block = min(from_block + max_blocks - 1, current_block)
+
+        if from_block > current_block:
+            return {'from_block': from_block, 'to_block': to_block,
+                    'positions_found': 0, 'blocks_remaining': 0, 'status': 'caught_up'}
+
+        positions_found = 0
+        position_rows = []
+        processed_tx_hashes = set()
+        block_timestamps = {}
+        start_time = time.time()
+
+        scan_from = from_block
+        while scan_from <= to_block:
+            # Stop before Vercel function timeout
+            if time.time() - start_time > INDEXER_TIME_BUDGET:
                 to_block = scan_from - 1
                 break
-            if 'too many' in err_msg or 'range' in err_msg or 'limit' in err_msg or 'rate' in err_msg:
-                smaller_range = max(50, LOGS_BLOCK_RANGE // 10)
-                scan_to = min(scan_from + smaller_range - 1, to_block)
+            windows = []
+            window_from = scan_from
+            while window_from <= to_block and len(windows) < LOGS_BATCH_WINDOWS:
+                window_to = min(window_from + LOGS_BLOCK_RANGE - 1, to_block)
+                windows.append((window_from, window_to))
+                window_from = window_to + 1
+            scan_to = windows[-1][1]
+
+            try:
                 try:
-                    logs = get_logs(scan_from, scan_to, CONTROLLER_CONTRACT,
-                                  [TOPIC_SHORT_OTOKEN_MINTED])
-                except Exception:
-                    scan_from = scan_to + 1
-                    continue
-            else:
-                to_block = scan_from - 1
-                break
-
-        if logs:
-            tx_hashes = list(set(log['transactionHash'] for log in logs))
-
-            for tx_hash in tx_hashes:
-                if _indexer_deadline and time.time() > _indexer_deadline:
+                    logs = get_logs_batch(windows, INDEXED_CONTRACTS, INDEXED_TOPICS)
+                except Exception as e:
+                    if 'time budget' in str(e).lower() or len(windows) == 1:
+                        raise
+                    # Batch rejected (unsupported or over a result cap): one window at a time
+                    scan_to = windows[0][1]
+                    logs = get_logs(scan_from, scan_to, INDEXED_CONTRACTS, INDEXED_TOPICS)
+            except Exception as e:
+                err_msg = str(e).lower()
+                if 'time budget' in err_msg:
+                    to_block = scan_from - 1
+                    break
+                if 'too many' in err_msg or 'range' in err_msg or 'limit' in err_msg or 'rate' in err_msg:
+                    smaller_range = max(50, LOGS_BLOCK_RANGE // 10)
+                    scan_to = min(scan_from + smaller_range - 1, to_block)
+                    try:
+                        logs = get_logs(scan_from, scan_to, INDEXED_CONTRACTS, INDEXED_TOPICS)
+                    except Exception:
+                        scan_from = scan_to + 1
+                        continue
+                else:
+                    to_block = scan_from - 1
                     break
-                if tx_hash in processed_tx_hashes:
-                    continue
-                processed_tx_hashes.add(tx_hash)
-
-                # Check if already indexed
-                cursor.execute("SELECT 1 FROM onchain_positions WHERE tx_hash = %s", (tx_hash,))
-                if cursor.fetchone():
-                    continue
 
-                try:
-                    receipt = get_receipt(tx_hash)
-                except Exception:
-                    continue
-                if not receipt:
-                    continue
-
-                position = decode_position_from_receipt(receipt, conn)
-                if not position:
-                    continue
-
-                # Get block timestamp (cached per block)
-                block_num = position['block_number']
-                if block_num not in block_timestamps:
+            if logs:
+                # Group logs by transaction; each group stands in for the receipt
+                tx_logs = {}
+                for log in logs:
+                    tx_logs.setdefault(log['transactionHash'], []).append(log)
+
+                # Only mints open a position
+                mint_txs = [tx_hash for tx_hash, receipt_logs in tx_logs.items()
+                            if tx_hash not in processed_tx_hashes
+                            and any(l.get('topics') and EVENT_KINDS.get(
+                                        (l['topics'][0].lower(), l.get('address', '').lower())) == 'short_minted'
+                                    for l in receipt_logs)]
+
+                # Check which are already indexed in one round trip
+                indexed = set()
+                if mint_txs:
+                    cursor.execute("SELECT tx_hash FROM onchain_positions WHERE tx_hash = ANY(%s)", (mint_txs,))
+                    indexed = {r['tx_hash'] for r in cursor.fetchall()}
+
+                # Registry rows for every minted otoken in this batch, in one query
+                get_otoken_infos({decode_address(l['topics'][1])
+                                  for h in mint_txs if h not in indexed
+                                  for l in tx_logs[h]
+                                  if len(l.get('topics') or []) >= 4 and EVENT_KINDS.get(
+                                      (l['topics'][0].lower(), l.get('address', '').lower())) == 'short_minted'},
+                                 conn)
+
+                # Prefetch timestamps for the new txs' blocks in batched requests;
+                # blocks missing afterwards fall back to one call each below
+                new_blocks = {int(tx_logs[h][0]['blockNumber'], 16) for h in mint_txs if h not in indexed}
+                new_blocks -= block_timestamps.keys()
+                if new_blocks:
                     try:
-                        ts = get_block_timestamp(block_num)
+                        fetched = get_block_timestamps(sorted(new_blocks))
                     except Exception:
-                        ts = None
-                    block_timestamps[block_num] = datetime.utcfromtimestamp(ts) if ts else None
-                position['block_timestamp'] = block_timestamps[block_num]
-
-                cursor.execute("""
-                    INSERT INTO onchain_positions
-                    (tx_hash, block_number, block_timestamp, user_address, asset, strike, expiry, is_put,
-                     collateral_amount, collateral_token, premium_amount, fee_amount, otoken_amount, otoken_address)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (tx_hash) DO NOTHING
-                """, (
-                    position['tx_hash'], position['block_number'], position['block_timestamp'],
-                    position['user_address'], position['asset'], position['strike'], position['expiry'],
-                    position['is_put'], position['collateral_amount'], position['collateral_token'],
-                    position['premium_amount'], position['fee_amount'], position['otoken_amount'],
-                    position['otoken_address']
-                ))
-                conn.commit()
-                positions_found += 1
+                        fetched = {}
+                    for block_num, ts in fetched.items():
+                        block_timestamps[block_num] = datetime.utcfromtimestamp(ts)
+
+                timed_out = False
+                for tx_hash in mint_txs:
+                    if _indexer_deadline and time.time() > _indexer_deadline:
+                        timed_out = True
+                        break
+                    processed_tx_hashes.add(tx_hash)
+                    if tx_hash in indexed:
+                        continue
+
+                    receipt_logs = tx_logs[tx_hash]
+                    receipt = {
+                        'transactionHash': tx_hash,
+                        'blockNumber': receipt_logs[0]['blockNumber'],
+                        'logs': receipt_logs,
+                    }
+                    position = decode_position_from_receipt(receipt, conn)
+                    if not position:
+                        continue
+
+                    # Get block timestamp (cached per block)
+                    block_num = position['block_number']
+                    if block_num not in block_timestamps:
+                        try:
+                            ts = get_block_timestamp(block_num)
+                        except Exception:
+                            ts = None
+                        block_timestamps[block_num] = datetime.utcfromtimestamp(ts) if ts else None
+                    position['block_timestamp'] = block_timestamps[block_num]
+
+                    position_rows.append((
+                        position['tx_hash'], position['block_number'], position['block_timestamp'],
+                        position['user_address'], position['asset'], position['strike'], position['expiry'],
+                        position['is_put'], position['collateral_amount'], position['collateral_token'],
+                        position['premium_amount'], position['fee_amount'], position['otoken_amount'],
+                        position['otoken_address']
+                    ))
+                    positions_found += 1
+
+                if timed_out:
+                    # Rescan this range next run; indexed txs are skipped above
+                    to_block = scan_from - 1
+                    break
+
+            scan_from = scan_to + 1
 
-        scan_from = scan_to + 1
+        if position_rows:
+            execute_values(cursor, """
+                INSERT INTO onchain_positions
+                (tx_hash, block_number, block_timestamp, user_address, asset, strike, expiry, is_put,
+                 collateral_amount, collateral_token, premium_amount, fee_amount, otoken_amount, otoken_address)
+                VALUES %s
+                ON CONFLICT (tx_hash) DO NOTHING
+            """, position_rows, page_size=500)
 
-    # Update last indexed block
-    cursor.execute(
-        "UPDATE indexer_state SET last_block = %s, updated_at = CURRENT_TIMESTAMP WHERE contract_address = %s",
-        (to_block, CONTROLLER_CONTRACT.lower()))
-    conn.commit()
-    conn.close()
+        # Update last indexed block; commits the new positions in the same transaction
+        cursor.execute(
+            "UPDATE indexer_state SET last_block = %s, updated_at = CURRENT_TIMESTAMP WHERE contract_address = %s",
+            (to_block, CONTROLLER_CONTRACT.lower()))
+        conn.commit()
+        _indexer_cursor['block'] = to_block
+        _indexer_cursor['ts'] = time.time()
 
     blocks_remaining = current_block - to_block
     return {
@@ -1918,125 +2509,260 @@ def index_activity_batch(max_blocks=None):
     }
 
 
-# ============== Routes ==============
+# ============== Response Memoization ==============
 
-@app.route('/')
-def index():
-    """Serve dashboard."""
-    return cached_html(DASHBOARD_HTML, max_age=1800, stale_revalidate=7200)
+# In-process cache for hot, cron-updated query results: key -> (stored_at, data).
+# Keys include query args, so it is capped and evicts least recently used.
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+RESPONSE_CACHE_SIZE = 256
 
 
-@app.route('/api/assets')
-def api_assets():
-    """Get list of tracked assets."""
-    try:
-        conn = get_db()
+def memoize_ttl(key, ttl, fn):
+    """Return fn()'s result, reusing a cached value younger than ttl seconds."""
+    now = time.monotonic()
+    with _response_cache_lock:
+        hit = _response_cache.get(key)
+        if hit and now - hit[0] < ttl:
+            _response_cache.move_to_end(key)
+            return hit[1]
+    # fn() runs unlocked so concurrent callers (/api/activity/all) don't serialize
+    data = fn()
+    with _response_cache_lock:
+        _response_cache[key] = (now, data)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+    return data
+
+
+def clear_response_cache():
+    """Drop memoized results after new data is written."""
+    with _response_cache_lock:
+        _response_cache.clear()
+
+
+def query_assets():
+    """Get list of tracked assets from the database."""
+    with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT DISTINCT asset FROM iv_snapshots ORDER BY asset")
-        assets = [row['asset'] for row in cursor.fetchall()]
-        conn.close()
-        return cached_json(assets, max_age=300, stale_revalidate=3600)
-    except Exception as e:
-        return jsonify([])
+        return [row['asset'] for row in cursor.fetchall()]
 
 
-@app.route('/api/latest')
-def api_latest():
-    """Get latest IV values with pricing indicator."""
-    asset = request.args.get('asset')
-    try:
-        conn = get_db()
+def query_iv(asset, days):
+    """Get an asset's IV time series, pre-encoded as JSON bytes."""
+    with get_db() as conn:
+        # Server-side cursor: rows arrive and are encoded in batches, so
+        # neither libpq nor Python holds the whole series at once
+        cursor = conn.cursor(name='iv_series')
+        cursor.itersize = 500
+        since = datetime.utcnow() - timedelta(days=days)
+        # dte/srt are the dashboard's DTE and σ√T (IV × √(DTE/365), 0 once expired),
+        # computed here so the browser only has to plot them
+        cursor.execute("""
+            SELECT s.*,
+                   CASE WHEN s.mid_iv IS NOT NULL AND s.dte IS NOT NULL
+                        THEN CASE WHEN s.dte > 0 AND s.mid_iv <> 0 THEN s.mid_iv * SQRT(s.dte / 365) ELSE 0 END
+                   END as srt
+            FROM (
+                SELECT *,
+                       CASE WHEN expiry ~ '^[0-9]{2}[A-Za-z]{3}[0-9]{2}$'
+                            THEN GREATEST(0, EXTRACT(EPOCH FROM TO_DATE(expiry, 'DDMONYY') - timestamp) / 86400)::float8
+                       END as dte
+                FROM iv_snapshots
+                WHERE asset = %s AND timestamp > %s
+            ) s
+            ORDER BY timestamp ASC
+        """, (asset, since))
+        body = encode_json_rows(cursor)
+        cursor.close()
+        return body
+
+
+def query_iv_summary(asset, days):
+    """Get record count, averages and last timestamp for an asset's IV series."""
+    with get_db() as conn:
         cursor = conn.cursor()
+        since = datetime.utcnow() - timedelta(days=days)
+        # avg_srt mirrors the dashboard's σ√T: IV × √(DTE/365), 0 once expired
+        cursor.execute("""
+            SELECT COUNT(*) as n,
+                   AVG(mid_iv) as avg_iv,
+                   AVG(apy) as avg_apy,
+                   AVG(CASE WHEN dte > 0 THEN mid_iv * SQRT(dte / 365) ELSE 0 END)
+                       FILTER (WHERE mid_iv IS NOT NULL AND dte IS NOT NULL) as avg_srt,
+                   MAX(timestamp) as last_ts
+            FROM (
+                SELECT mid_iv, apy, timestamp,
+                       CASE WHEN expiry ~ '^[0-9]{2}[A-Za-z]{3}[0-9]{2}$'
+                            THEN EXTRACT(EPOCH FROM TO_DATE(expiry, 'DDMONYY') - timestamp) / 86400
+                       END as dte
+                FROM iv_snapshots
+                WHERE asset = %s AND timestamp > %s
+            ) s
+        """, (asset, since))
+        return cursor.fetchone()
 
-        asset_clause = "AND asset = %(asset)s" if asset else ""
-        params = {'asset': asset} if asset else {}
 
-        # Single query: latest values + percentile stats from 7-day history via SQL
-        cursor.execute(f"""
-            WITH latest AS (
-                SELECT DISTINCT ON (asset, strike, expiry) *
+def query_signals(asset):
+    """Get σ√T percentile signals for the latest point of each option over 7 days."""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        since = datetime.utcnow() - timedelta(days=7)
+        # Same rules as the dashboard used to apply client-side: >= 10 points,
+        # >= 7 DTE, latest σ√T at or below the 10th / at or above the 90th
+        # percentile of its own history
+        cursor.execute("""
+            WITH pts AS (
+                SELECT strike, expiry, option_type, timestamp, mid_iv,
+                       CASE WHEN expiry ~ '^[0-9]{2}[A-Za-z]{3}[0-9]{2}$'
+                            THEN EXTRACT(EPOCH FROM TO_DATE(expiry, 'DDMONYY') - timestamp) / 86400
+                       END as dte
                 FROM iv_snapshots
-                WHERE 1=1 {asset_clause}
-                ORDER BY asset, strike, expiry, timestamp DESC
+                WHERE asset = %s AND timestamp > %s AND mid_iv > 0
             ),
-            hist_stats AS (
-                SELECT asset, strike, expiry,
-                       COUNT(*) as cnt,
-                       ROUND(MIN(mid_iv)::numeric, 2) as iv_min,
-                       ROUND(MAX(mid_iv)::numeric, 2) as iv_max
-                FROM iv_snapshots
-                WHERE timestamp > NOW() - INTERVAL '7 days'
-                  AND mid_iv IS NOT NULL {asset_clause}
-                GROUP BY asset, strike, expiry
+            srt AS (
+                SELECT strike, expiry, option_type, mid_iv, dte,
+                       mid_iv * SQRT(dte / 365) as srt,
+                       ROW_NUMBER() OVER w as rn,
+                       FIRST_VALUE(mid_iv * SQRT(dte / 365)) OVER w as latest_srt
+                FROM pts
+                WHERE dte > 0
+                WINDOW w AS (PARTITION BY strike, expiry ORDER BY timestamp DESC)
             ),
-            hist_below AS (
-                SELECT h.asset, h.strike, h.expiry,
-                       COUNT(*) as cnt_below
-                FROM iv_snapshots h
-                JOIN latest l USING (asset, strike, expiry)
-                WHERE h.timestamp > NOW() - INTERVAL '7 days'
-                  AND h.mid_iv IS NOT NULL
-                  AND h.mid_iv < l.mid_iv
-                GROUP BY h.asset, h.strike, h.expiry
+            -- One pass per option: count the history below the latest σ√T
+            scored AS (
+                SELECT strike, expiry,
+                       MAX(option_type) FILTER (WHERE rn = 1) as option_type,
+                       MAX(mid_iv) FILTER (WHERE rn = 1) as latest_iv,
+                       MAX(latest_srt) as latest_srt,
+                       MAX(dte) FILTER (WHERE rn = 1) as dte,
+                       100.0 * COUNT(*) FILTER (WHERE rn > 1 AND srt < latest_srt) / (COUNT(*) - 1) as pct
+                FROM srt
+                GROUP BY strike, expiry
+                HAVING COUNT(*) >= 10
             )
-            SELECT l.*,
-                   CASE WHEN s.cnt >= 3 AND l.mid_iv IS NOT NULL
-                        THEN ROUND(COALESCE(b.cnt_below, 0)::numeric / s.cnt * 100, 1)
-                   END as iv_percentile,
-                   CASE WHEN s.cnt >= 3 AND l.mid_iv IS NOT NULL THEN s.iv_min END as iv_min,
-                   CASE WHEN s.cnt >= 3 AND l.mid_iv IS NOT NULL THEN s.iv_max END as iv_max
-            FROM latest l
-            LEFT JOIN hist_stats s USING (asset, strike, expiry)
-            LEFT JOIN hist_below b USING (asset, strike, expiry)
-        """, params)
-        rows = cursor.fetchall()
-        conn.close()
-
-        results = []
-        for r in rows:
-            row = dict(r)
-            pct = row.get('iv_percentile')
-            if pct is not None:
-                if pct >= 75:
-                    row['pricing'] = 'EXPENSIVE'
-                elif pct <= 25:
-                    row['pricing'] = 'CHEAP'
-                else:
-                    row['pricing'] = 'FAIR'
-            else:
-                row['pricing'] = None
-            results.append(row)
+            SELECT strike, expiry, option_type, latest_iv, latest_srt, dte, pct,
+                   CASE WHEN pct <= 10 THEN 'BUY' ELSE 'SELL' END as signal,
+                   dte >= 14 as is_long_dated
+            FROM scored
+            WHERE dte >= 7 AND (pct <= 10 OR pct >= 90)
+            ORDER BY is_long_dated DESC, (pct >= 90) DESC,
+                     CASE WHEN pct >= 90 THEN -pct ELSE pct END
+        """, (asset, since))
+        return cursor.fetchall()
+
+
+# Latest value per (asset, strike, expiry) with 7-day percentile stats and
+# pricing label; materialized as iv_latest_mv
+LATEST_SQL = """
+    WITH latest AS (
+        SELECT DISTINCT ON (asset, strike, expiry) *
+        FROM iv_snapshots
+        ORDER BY asset, strike, expiry, timestamp DESC
+    ),
+    hist_stats AS (
+        -- One pass over the 7-day history: count, range and
+        -- how many points sit below the latest value
+        SELECT h.asset, h.strike, h.expiry,
+               COUNT(*) as cnt,
+               COUNT(*) FILTER (WHERE h.mid_iv < l.mid_iv) as cnt_below,
+               ROUND(MIN(h.mid_iv)::numeric, 2) as iv_min,
+               ROUND(MAX(h.mid_iv)::numeric, 2) as iv_max
+        FROM iv_snapshots h
+        JOIN latest l USING (asset, strike, expiry)
+        WHERE h.timestamp > NOW() - INTERVAL '7 days'
+          AND h.mid_iv IS NOT NULL
+        GROUP BY h.asset, h.strike, h.expiry
+    ),
+    ranked AS (
+        SELECT l.*,
+               CASE WHEN s.cnt >= 3 AND l.mid_iv IS NOT NULL
+                    THEN ROUND(s.cnt_below::numeric / s.cnt * 100, 1)
+               END as iv_percentile,
+               CASE WHEN s.cnt >= 3 AND l.mid_iv IS NOT NULL THEN s.iv_min END as iv_min,
+               CASE WHEN s.cnt >= 3 AND l.mid_iv IS NOT NULL THEN s.iv_max END as iv_max
+        FROM latest l
+        LEFT JOIN hist_stats s USING (asset, strike, expiry)
+    )
+    SELECT *,
+           CASE WHEN iv_percentile >= 75 THEN 'EXPENSIVE'
+                WHEN iv_percentile <= 25 THEN 'CHEAP'
+                WHEN iv_percentile IS NOT NULL THEN 'FAIR'
+           END as pricing
+    FROM ranked
+"""
+LATEST_SQL_VERSION = hashlib.md5(LATEST_SQL.encode('utf-8')).hexdigest()[:12]
 
-        return cached_json(results, max_age=600, stale_revalidate=900)
-    except Exception as e:
-        return jsonify([])
 
+def query_latest_view(conn, sql, params=None):
+    """
+    Run sql with {latest} bound to the iv_latest_mv materialized view.
 
-@app.route('/api/iv/<asset>')
-def api_iv(asset):
-    """Get IV time series for an asset."""
-    days = request.args.get('days', 7, type=int)
+    Falls back to the live LATEST_SQL query until init_db has created the view.
+    """
+    cursor = conn.cursor()
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        since = datetime.utcnow() - timedelta(days=days)
-        cursor.execute("""
-            SELECT * FROM iv_snapshots
-            WHERE asset = %s AND timestamp > %s
-            ORDER BY timestamp ASC
-        """, (asset, since))
-        rows = cursor.fetchall()
-        conn.close()
-        return cached_json([dict(r) for r in rows], max_age=120, stale_revalidate=600)
-    except Exception as e:
-        return jsonify([])
+        cursor.execute(sql.format(latest='iv_latest_mv'), params)
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        cursor.execute(sql.format(latest=f"({LATEST_SQL})"), params)
+    return cursor.fetchall()
 
 
-@app.route('/api/forecasts/<asset>')
-def api_forecasts(asset):
-    """Get latest precomputed IV forecasts for an asset."""
+@lru_cache(maxsize=None)
+def parse_expiry(expiry):
+    """Parse a DDMMMYY expiry to a datetime, or None if unparseable."""
     try:
-        conn = get_db()
+        return datetime.strptime(expiry, '%d%b%y')
+    except (TypeError, ValueError):
+        return None
+
+
+def add_dte_srt(rows):
+    """Set each snapshot row's dte and srt the same way query_iv computes them."""
+    for row in rows:
+        expiry = parse_expiry(row['expiry'])
+        dte = max(0.0, (expiry - row['timestamp']).total_seconds() / 86400) if expiry and row['timestamp'] else None
+        iv = row['mid_iv']
+        row['dte'] = dte
+        row['srt'] = None if iv is None or dte is None else (iv * math.sqrt(dte / 365) if dte > 0 and iv else 0.0)
+    return rows
+
+
+def query_latest(asset=None):
+    """Get latest IV values with 7-day percentile stats, pricing label, DTE and σ√T."""
+    asset_clause = "WHERE asset = %(asset)s" if asset else ""
+    params = {'asset': asset} if asset else {}
+    with get_db() as conn:
+        return add_dte_srt(query_latest_view(conn, f"""
+            SELECT * FROM {{latest}} latest
+            {asset_clause}
+            ORDER BY asset, strike, expiry
+        """, params))
+
+
+def query_pricing():
+    """Get the average latest-IV percentile and pricing label per asset."""
+    with get_db() as conn:
+        return query_latest_view(conn, """
+            SELECT asset,
+                   AVG(iv_percentile) as avg_percentile,
+                   CASE WHEN AVG(iv_percentile) >= 75 THEN 'EXPENSIVE'
+                        WHEN AVG(iv_percentile) <= 25 THEN 'CHEAP'
+                        WHEN AVG(iv_percentile) IS NOT NULL THEN 'FAIR'
+                   END as pricing,
+                   MAX(timestamp) as latest_timestamp
+            FROM {latest} latest
+            GROUP BY asset
+            ORDER BY asset
+        """)
+
+
+def query_forecasts(asset):
+    """Get the most recent forecast run for an asset."""
+    with get_db() as conn:
         cursor = conn.cursor()
         # Get the most recent generated_at for this asset
         cursor.execute("""
@@ -2045,105 +2771,20 @@ def api_forecasts(asset):
         """, (asset,))
         row = cursor.fetchone()
         if not row:
-            conn.close()
-            return jsonify([])
-        latest_gen = row['generated_at']
+            return []
         cursor.execute("""
             SELECT strike, expiry, option_type, forecast_timestamp,
                    forecast_mid_iv, quantile_10, quantile_90
             FROM iv_forecasts
             WHERE asset = %s AND generated_at = %s
             ORDER BY strike, expiry, forecast_timestamp
-        """, (asset, latest_gen))
-        rows = cursor.fetchall()
-        conn.close()
-        return cached_json([dict(r) for r in rows], max_age=3600, stale_revalidate=7200)
-    except Exception as e:
-        return jsonify([])
+        """, (asset, row['generated_at']))
+        return cursor.fetchall()
 
 
-@app.route('/api/cron/fetch')
-def cron_fetch():
-    """Cron endpoint to fetch IV data."""
-    # Verify cron secret for security
-    auth = request.headers.get('Authorization', '')
-    if CRON_SECRET and auth != f'Bearer {CRON_SECRET}':
-        # Also check Vercel cron header
-        if request.headers.get('x-vercel-cron') != '1':
-            return jsonify({'error': 'Unauthorized'}), 401
-
-    try:
-        init_db()
-        records = fetch_iv_data()
-        if records:
-            save_records(records)
-            return jsonify({'success': True, 'records': len(records)})
-        return jsonify({'success': True, 'records': 0, 'message': 'No data found'})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/fetch', methods=['POST'])
-def manual_fetch():
-    """Manual fetch endpoint (requires secret)."""
-    auth = request.headers.get('Authorization', '')
-    if CRON_SECRET and auth != f'Bearer {CRON_SECRET}':
-        return jsonify({'error': 'Unauthorized'}), 401
-
-    try:
-        init_db()
-        records = fetch_iv_data()
-        if records:
-            save_records(records)
-            return jsonify({'success': True, 'records': len(records)})
-        return jsonify({'success': True, 'records': 0})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/activity')
-def activity_page():
-    """Serve on-chain activity dashboard."""
-    return cached_html(ACTIVITY_HTML, max_age=1800, stale_revalidate=7200)
-
-
-@app.route('/api/cron/index-activity')
-def cron_index_activity():
-    """Cron endpoint to index on-chain activity."""
-    auth = request.headers.get('Authorization', '')
-    if CRON_SECRET and auth != f'Bearer {CRON_SECRET}':
-        if request.headers.get('x-vercel-cron') != '1':
-            return jsonify({'error': 'Unauthorized'}), 401
-    try:
-        init_activity_db()
-        # One-time data fixes from early mapping bugs
-        try:
-            conn = get_db()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE onchain_positions SET asset = 'HYPE' WHERE asset LIKE '0x5555%'")
-            cursor.execute("UPDATE onchain_positions SET asset = 'ETH' WHERE asset LIKE '0xbe67%'")
-            # Fix kHYPE collateral (200e18 = 200 kHYPE)
-            cursor.execute(
-                "UPDATE onchain_positions SET collateral_amount = 200, collateral_token = 'kHYPE' "
-                "WHERE collateral_amount IS NULL AND tx_hash = '0x4324c4f0a6aac76db8fd40ea2521a747b50ee0e7ae17d070b2fc5a3b1870cbe3'")
-            conn.commit()
-            conn.close()
-        except Exception:
-            pass
-        result = index_activity_batch()
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/activity/positions')
-def api_activity_positions():
+def query_activity_positions(asset, days, limit):
     """Get recent on-chain positions."""
-    asset = request.args.get('asset')
-    days = request.args.get('days', 30, type=int)
-    limit = request.args.get('limit', 100, type=int)
-    try:
-        conn = get_db()
+    with get_db() as conn:
         cursor = conn.cursor()
         since = datetime.utcnow() - timedelta(days=days)
         query = "SELECT * FROM onchain_positions WHERE block_timestamp > %s"
@@ -2154,20 +2795,12 @@ def api_activity_positions():
         query += " ORDER BY block_timestamp DESC LIMIT %s"
         params.append(min(limit, 500))
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        return cached_json([dict(r) for r in rows], max_age=120, stale_revalidate=600)
-    except Exception as e:
-        return jsonify([])
+        return cursor.fetchall()
 
 
-@app.route('/api/activity/volume')
-def api_activity_volume():
+def query_activity_volume(asset, days):
     """Get volume over time aggregated by day and asset."""
-    asset = request.args.get('asset')
-    days = request.args.get('days', 30, type=int)
-    try:
-        conn = get_db()
+    with get_db() as conn:
         cursor = conn.cursor()
         since = datetime.utcnow() - timedelta(days=days)
         query = """
@@ -2184,20 +2817,28 @@ def api_activity_volume():
             params.append(asset)
         query += " GROUP BY DATE(block_timestamp), asset ORDER BY date"
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        return cached_json([dict(r) for r in rows], max_age=120, stale_revalidate=600)
-    except Exception as e:
-        return jsonify([])
-
-
-@app.route('/api/activity/stats')
-def api_activity_stats():
+        return cursor.fetchall()
+
+
+def pivot_activity_volume(rows):
+    """Pivot daily (date, asset) volume rows into per-asset series over one date axis."""
+    dates = sorted({r['date'] for r in rows})
+    index = {d: i for i, d in enumerate(dates)}
+    premium = {}
+    counts = [0] * len(dates)
+    for r in rows:
+        i = index[r['date']]
+        series = premium.get(r['asset'])
+        if series is None:
+            series = premium[r['asset']] = [0] * len(dates)
+        series[i] = r['total_premium']
+        counts[i] += r['trade_count']
+    return {'dates': dates, 'assets': list(premium), 'premium': premium, 'counts': counts}
+
+
+def query_activity_stats(asset, days):
     """Get summary stats for on-chain activity."""
-    asset = request.args.get('asset')
-    days = request.args.get('days', 30, type=int)
-    try:
-        conn = get_db()
+    with get_db() as conn:
         cursor = conn.cursor()
         since = datetime.utcnow() - timedelta(days=days)
         query = """
@@ -2213,20 +2854,12 @@ def api_activity_stats():
             query += " AND asset = %s"
             params.append(asset)
         cursor.execute(query, params)
-        row = cursor.fetchone()
-        conn.close()
-        return cached_json(dict(row) if row else {}, max_age=120, stale_revalidate=600)
-    except Exception as e:
-        return jsonify({})
+        return cursor.fetchone()
 
 
-@app.route('/api/activity/heatmap')
-def api_activity_heatmap():
+def query_activity_heatmap(asset, days):
     """Get hour-of-day vs day-of-week trade counts."""
-    asset = request.args.get('asset')
-    days = request.args.get('days', 30, type=int)
-    try:
-        conn = get_db()
+    with get_db() as conn:
         cursor = conn.cursor()
         since = datetime.utcnow() - timedelta(days=days)
         query = """
@@ -2242,20 +2875,12 @@ def api_activity_heatmap():
             params.append(asset)
         query += " GROUP BY hour, dow ORDER BY dow, hour"
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        return cached_json([dict(r) for r in rows], max_age=120, stale_revalidate=600)
-    except Exception as e:
-        return jsonify([])
+        return cursor.fetchall()
 
 
-@app.route('/api/activity/strikes')
-def api_activity_strikes():
+def query_activity_strikes(asset, days):
     """Get strike/expiry distribution."""
-    asset = request.args.get('asset')
-    days = request.args.get('days', 30, type=int)
-    try:
-        conn = get_db()
+    with get_db() as conn:
         cursor = conn.cursor()
         since = datetime.utcnow() - timedelta(days=days)
         query = """
@@ -2272,20 +2897,12 @@ def api_activity_strikes():
             params.append(asset)
         query += " GROUP BY strike, expiry, is_put ORDER BY count DESC LIMIT 50"
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        return cached_json([dict(r) for r in rows], max_age=120, stale_revalidate=600)
-    except Exception as e:
-        return jsonify([])
+        return cursor.fetchall()
 
 
-@app.route('/api/activity/correlation')
-def api_activity_correlation():
+def query_activity_correlation(asset, days):
     """Get positions correlated with IV at time of trade."""
-    asset = request.args.get('asset')
-    days = request.args.get('days', 30, type=int)
-    try:
-        conn = get_db()
+    with get_db() as conn:
         cursor = conn.cursor()
         since = datetime.utcnow() - timedelta(days=days)
         query = """
@@ -2313,186 +2930,591 @@ def api_activity_correlation():
             params.append(asset)
         query += " ORDER BY p.block_timestamp DESC LIMIT 200"
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        return cached_json([dict(r) for r in rows], max_age=120, stale_revalidate=600)
+        return cursor.fetchall()
+
+
+# ============== Routes ==============
+
+# Encode and gzip the static pages at import so no request pays for it
+for _page in (DASHBOARD_HTML, ACTIVITY_HTML):
+    _encode_page(_page)
+
+
+@app.route('/')
+def index():
+    """Serve dashboard."""
+    return cached_html(DASHBOARD_HTML, max_age=1800, stale_revalidate=7200)
+
+
+@app.route('/api/assets')
+def api_assets():
+    """Get list of tracked assets."""
+    try:
+        assets = memoize_ttl('assets', 300, query_assets)
+        return cached_json(assets, max_age=300, stale_revalidate=3600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/latest')
+def api_latest():
+    """Get latest IV values with pricing indicator."""
+    asset = request.args.get('asset')
+    try:
+        results = memoize_ttl(('latest', asset), 60, lambda: query_latest(asset))
+        return cached_json(results, max_age=600, stale_revalidate=900)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/pricing')
+def api_pricing():
+    """Get aggregate pricing indicator per asset."""
+    try:
+        results = memoize_ttl('pricing', 60, query_pricing)
+        return cached_json(results, max_age=600, stale_revalidate=900)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/iv/<asset>')
+def api_iv(asset):
+    """Get IV time series for an asset."""
+    days = request.args.get('days', 7, type=int)
+    try:
+        # Hits reuse the serialized payload until the TTL or the next scrape
+        body = memoize_ttl(('iv', asset, days), 120, lambda: query_iv(asset, days))
+        return cached_json(body, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/iv/<asset>/summary')
+def api_iv_summary(asset):
+    """Get stat-tile summary of an asset's IV time series."""
+    days = request.args.get('days', 7, type=int)
+    try:
+        summary = memoize_ttl(('iv_summary', asset, days), 120, lambda: query_iv_summary(asset, days))
+        return cached_json(summary, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/signals/<asset>')
+def api_signals(asset):
+    """Get σ√T percentile signals for an asset."""
+    try:
+        rows = memoize_ttl(('signals', asset), 120, lambda: query_signals(asset))
+        return cached_json(rows, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/forecasts/<asset>')
+def api_forecasts(asset):
+    """Get latest precomputed IV forecasts for an asset."""
+    try:
+        rows = memoize_ttl(('forecasts', asset), 300, lambda: query_forecasts(asset))
+        return cached_json(rows, max_age=3600, stale_revalidate=7200)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/cron/fetch')
+def cron_fetch():
+    """Cron endpoint to fetch IV data."""
+    # Verify cron secret for security
+    auth = request.headers.get('Authorization', '')
+    if CRON_SECRET and auth != f'Bearer {CRON_SECRET}':
+        # Also check Vercel cron header
+        if request.headers.get('x-vercel-cron') != '1':
+            return ojsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        records = fetch_and_save()
+        if records:
+            return ojsonify({'success': True, 'records': len(records)})
+        return ojsonify({'success': True, 'records': 0, 'message': 'No data found'})
     except Exception as e:
-        return jsonify([])
+        return error_response(e)
+
+
+@app.route('/api/fetch', methods=['POST'])
+def manual_fetch():
+    """Manual fetch endpoint (requires secret)."""
+    auth = request.headers.get('Authorization', '')
+    if CRON_SECRET and auth != f'Bearer {CRON_SECRET}':
+        return ojsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        records = fetch_and_save()
+        if records:
+            return ojsonify({'success': True, 'records': len(records)})
+        return ojsonify({'success': True, 'records': 0})
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/activity')
+def activity_page():
+    """Serve on-chain activity dashboard."""
+    return cached_html(ACTIVITY_HTML, max_age=1800, stale_revalidate=7200)
+
+
+@app.route('/api/cron/index-activity')
+def cron_index_activity():
+    """Cron endpoint to index on-chain activity."""
+    auth = request.headers.get('Authorization', '')
+    if CRON_SECRET and auth != f'Bearer {CRON_SECRET}':
+        if request.headers.get('x-vercel-cron') != '1':
+            return ojsonify({'error': 'Unauthorized'}), 401
+    try:
+        init_activity_db()
+        # One-time data fixes from early mapping bugs
+        try:
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute("UPDATE onchain_positions SET asset = 'HYPE' WHERE asset LIKE '0x5555%'")
+                cursor.execute("UPDATE onchain_positions SET asset = 'ETH' WHERE asset LIKE '0xbe67%'")
+                # Fix kHYPE collateral (200e18 = 200 kHYPE)
+                cursor.execute(
+                    "UPDATE onchain_positions SET collateral_amount = 200, collateral_token = 'kHYPE' "
+                    "WHERE collateral_amount IS NULL AND tx_hash = '0x4324c4f0a6aac76db8fd40ea2521a747b50ee0e7ae17d070b2fc5a3b1870cbe3'")
+                conn.commit()
+        except Exception:
+            pass
+        result = index_activity_batch()
+        if result['positions_found']:
+            clear_response_cache()
+        return ojsonify(result)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/activity/positions')
+def api_activity_positions():
+    """Get recent on-chain positions."""
+    asset = request.args.get('asset')
+    days = request.args.get('days', 30, type=int)
+    limit = request.args.get('limit', 100, type=int)
+    try:
+        rows = memoize_ttl(('activity_positions', asset, days, limit), 60,
+                           lambda: query_activity_positions(asset, days, limit))
+        return cached_json(rows, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/activity/volume')
+def api_activity_volume():
+    """Get volume over time aggregated by day and asset."""
+    asset = request.args.get('asset')
+    days = request.args.get('days', 30, type=int)
+    try:
+        rows = memoize_ttl(('activity_volume', asset, days), 60,
+                           lambda: query_activity_volume(asset, days))
+        return cached_json(rows, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/activity/stats')
+def api_activity_stats():
+    """Get summary stats for on-chain activity."""
+    asset = request.args.get('asset')
+    days = request.args.get('days', 30, type=int)
+    try:
+        row = memoize_ttl(('activity_stats', asset, days), 60,
+                          lambda: query_activity_stats(asset, days))
+        return cached_json(row or {}, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/activity/heatmap')
+def api_activity_heatmap():
+    """Get hour-of-day vs day-of-week trade counts."""
+    asset = request.args.get('asset')
+    days = request.args.get('days', 30, type=int)
+    try:
+        rows = memoize_ttl(('activity_heatmap', asset, days), 60,
+                           lambda: query_activity_heatmap(asset, days))
+        return cached_json(rows, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/activity/strikes')
+def api_activity_strikes():
+    """Get strike/expiry distribution."""
+    asset = request.args.get('asset')
+    days = request.args.get('days', 30, type=int)
+    try:
+        rows = memoize_ttl(('activity_strikes', asset, days), 60,
+                           lambda: query_activity_strikes(asset, days))
+        return cached_json(rows, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/activity/correlation')
+def api_activity_correlation():
+    """Get positions correlated with IV at time of trade."""
+    asset = request.args.get('asset')
+    days = request.args.get('days', 30, type=int)
+    try:
+        rows = memoize_ttl(('activity_correlation', asset, days), 60,
+                           lambda: query_activity_correlation(asset, days))
+        return cached_json(rows, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
+
+
+@app.route('/api/activity/all')
+def api_activity_all():
+    """Get every activity page dataset in one response."""
+    asset = request.args.get('asset')
+    days = request.args.get('days', 30, type=int)
+    limit = request.args.get('limit', 100, type=int)
+    try:
+        # Shares memo keys with the individual endpoints, except volume: that is cached
+        # already pivoted under its own 'activity_volume_pivot' key, separate from the
+        # raw rows /api/activity/volume caches under 'activity_volume'
+        jobs = {
+            'stats': (('activity_stats', asset, days), lambda: query_activity_stats(asset, days)),
+            'volume': (('activity_volume_pivot', asset, days),
+                       lambda: pivot_activity_volume(query_activity_volume(asset, days))),
+            'positions': (('activity_positions', asset, days, limit),
+                          lambda: query_activity_positions(asset, days, limit)),
+            'heatmap': (('activity_heatmap', asset, days), lambda: query_activity_heatmap(asset, days)),
+            'strikes': (('activity_strikes', asset, days), lambda: query_activity_strikes(asset, days)),
+            'correlation': (('activity_correlation', asset, days),
+                            lambda: query_activity_correlation(asset, days)),
+        }
+        # Worker threads have no request context, so each borrows its own pooled
+        # connection; more workers than the pool holds would only queue for one
+        with ThreadPoolExecutor(max_workers=min(len(jobs), PG_POOL_MAX)) as executor:
+            futures = {name: executor.submit(memoize_ttl, key, 60, fn) for name, (key, fn) in jobs.items()}
+            body = {name: future.result() for name, future in futures.items()}
+        body['stats'] = body['stats'] or {}
+        return cached_json(body, max_age=120, stale_revalidate=600)
+    except Exception as e:
+        return error_response(e)
 
 
 # ============== Scraping Logic ==============
 
+# Shared across warm invocations so the Rysk fetch reuses DNS, TCP and TLS setup
+SESSION = requests.Session()
+SESSION.headers.update({'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'})
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(
+    total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])))
+
+_INVENTORY_KEY = b'"serverInventory":'
+_JSON_DECODER = json.JSONDecoder()
+
+# Regex fallback, compiled once at import; the raw page bytes are scanned with finditer over slices
+_UNESCAPE_RE = re.compile(rb'\\(["\\])')
+_ASSET_RE = re.compile(rb'"([A-Z]{2,6})":\{"combinations"')
+_SPOT_RE = re.compile(rb'"([A-Z]{2,6})":\{"combinations":\{[^}]*?"index":([\d.]+)')
+_ENTRY_RE = re.compile(
+    rb'"([\d.]+)-([\d]+)":\{'
+    rb'"expiry":"([^"]+)"[^}]*?'
+    rb'"strike":([\d.]+)[^}]*?'
+    rb'"isPut":(true|false)[^}]*?'
+    rb'"bidIv":([\d.]+)[^}]*?'
+    rb'"askIv":([\d.]+)[^}]*?'
+    rb'"apy":([\d.]+)'
+)
+
+
 def fetch_iv_data():
     """Fetch IV data from Rysk Finance."""
     url = 'https://app.rysk.finance'
-    headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
 
-    response = requests.get(url, headers=headers, timeout=30)
-    html = response.text.replace('\\"', '"').replace('\\\\', '\\')
+    # Work on the (already gzip-decoded) bytes; only matched fields get decoded
+    with SESSION.get(url, timeout=30, stream=True) as response:
+        html = _UNESCAPE_RE.sub(rb'\1', response.content)
+
+    # Prefer one JSON decode of the embedded inventory; fall back to regex scraping
+    inventory = parse_server_inventory(html)
+    if inventory:
+        spot_prices, entries = inventory_entries(inventory)
+    else:
+        spot_prices = extract_spot_prices(html)
+        entries = regex_entries(html)
+
+    # Solve IV from APY in one batch for entries quoted with zero bid/ask IV
+    solve_idx, solve_args = [], []
+    for i, (asset, expiry, strike, is_put, bid_iv_f, ask_iv_f, apy_f) in enumerate(entries):
+        if bid_iv_f == 0 and apy_f > 0 and spot_prices.get(asset):
+            dte = calc_dte(expiry)
+            if dte is not None and strike > 0:
+                solve_idx.append(i)
+                solve_args.append((spot_prices[asset], strike, dte, apy_f, is_put))
+    solved = {}
+    if solve_args:
+        ivs = calculate_ivs_from_apy(*zip(*solve_args))
+        solved = {i: float(iv) for i, iv in zip(solve_idx, ivs) if not np.isnan(iv)}
 
     records = []
-    spot_prices = extract_spot_prices(html)
+    for i, (asset, expiry, strike, is_put, bid_iv_f, ask_iv_f, apy_f) in enumerate(entries):
+        if i in solved:
+            bid_iv_f = ask_iv_f = solved[i]
+
+        mid_iv = (bid_iv_f + ask_iv_f) / 2 if bid_iv_f > 0 else None
+
+        records.append({
+            'asset': asset,
+            'strike': strike,
+            'expiry': expiry,
+            'bid_iv': bid_iv_f if bid_iv_f > 0 else None,
+            'ask_iv': ask_iv_f if ask_iv_f > 0 else None,
+            'mid_iv': mid_iv,
+            'option_type': 'put' if is_put else 'call',
+            'apy': apy_f if apy_f > 0 else None
+        })
+
+    # Filter valid records
+    return [r for r in records if r.get('mid_iv') or r.get('apy')]
 
-    # Dynamically detect all assets from HTML
-    asset_matches = re.findall(r'"([A-Z]{2,6})":\{"combinations"', html)
-    asset_positions = []
 
-    for asset in asset_matches:
-        pos = html.find(f'"{asset}":{{"combinations":')
-        if pos >= 0:
-            asset_positions.append((asset, pos))
+def parse_server_inventory(html):
+    """
+    Decode the embedded serverInventory object in one JSON parse.
+
+    Structure: serverInventory.{ASSET}.combinations.{strike-timestamp} = {
+        expiry, strike, isPut, bidIv, askIv, apy, index, ...
+    }
+    Returns the decoded dict, or None if it is missing or malformed.
+    """
+    pos = html.find(_INVENTORY_KEY)
+    if pos < 0:
+        return None
+    try:
+        # Decode only from the key onward; raw_decode stops at the object's end
+        text = html[pos + len(_INVENTORY_KEY):].decode('utf-8')
+        inventory, _ = _JSON_DECODER.raw_decode(text)
+    except ValueError:
+        return None
+    return inventory if isinstance(inventory, dict) else None
 
-    asset_positions.sort(key=lambda x: x[1])
 
+def inventory_entries(inventory):
+    """Flatten a decoded serverInventory into spot prices and entry tuples."""
+    spot_prices = {}
+    entries = []
+    for asset, section in inventory.items():
+        combinations = section.get('combinations') if isinstance(section, dict) else None
+        if not isinstance(combinations, dict):
+            continue
+        for combo in combinations.values():
+            if not isinstance(combo, dict):
+                continue
+            if asset not in spot_prices and combo.get('index') is not None:
+                spot_prices[asset] = float(combo['index'])
+            try:
+                entries.append((asset, combo['expiry'], float(combo['strike']), combo['isPut'] is True,
+                                float(combo['bidIv']), float(combo['askIv']), float(combo['apy'])))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return spot_prices, entries
+
+
+def regex_entries(html):
+    """Scrape entry tuples from the unescaped page with the entry regex."""
+    # Dynamically detect all assets from HTML (first occurrence of each)
+    first_pos = {}
+    for m in _ASSET_RE.finditer(html):
+        first_pos.setdefault(m.group(1).decode('ascii'), m.start())
+    asset_positions = sorted(first_pos.items(), key=lambda x: x[1])
+
+    entries = []
     for i, (asset, start_pos) in enumerate(asset_positions):
         end_pos = asset_positions[i + 1][1] if i + 1 < len(asset_positions) else start_pos + 20000
-        chunk = html[start_pos:end_pos]
-
-        pattern = (
-            r'"([\d.]+)-([\d]+)":\{'
-            r'"expiry":"([^"]+)"[^}]*?'
-            r'"strike":([\d.]+)[^}]*?'
-            r'"isPut":(true|false)[^}]*?'
-            r'"bidIv":([\d.]+)[^}]*?'
-            r'"askIv":([\d.]+)[^}]*?'
-            r'"apy":([\d.]+)'
-        )
-
-        entries = re.findall(pattern, chunk)
-
-        for entry in entries:
-            strike_key, timestamp, expiry, strike, is_put, bid_iv, ask_iv, apy = entry
-
-            bid_iv_f = float(bid_iv)
-            ask_iv_f = float(ask_iv)
-            apy_f = float(apy)
-
-            # Calculate IV from APY if bid/ask IV is 0
-            if bid_iv_f == 0 and apy_f > 0:
-                spot = spot_prices.get(asset)
-                if spot:
-                    calc_iv = calculate_iv_from_apy(
-                        spot=spot,
-                        strike=float(strike),
-                        expiry=expiry,
-                        apy=apy_f,
-                        is_put=(is_put == 'true')
-                    )
-                    if calc_iv:
-                        bid_iv_f = ask_iv_f = calc_iv
-
-            mid_iv = (bid_iv_f + ask_iv_f) / 2 if bid_iv_f > 0 else None
-
-            records.append({
-                'asset': asset,
-                'strike': float(strike),
-                'expiry': expiry,
-                'bid_iv': bid_iv_f if bid_iv_f > 0 else None,
-                'ask_iv': ask_iv_f if ask_iv_f > 0 else None,
-                'mid_iv': mid_iv,
-                'option_type': 'put' if is_put == 'true' else 'call',
-                'apy': apy_f if apy_f > 0 else None
-            })
-
-    # Filter valid records
-    return [r for r in records if r.get('mid_iv') or r.get('apy')]
+        for m in _ENTRY_RE.finditer(html, start_pos, end_pos):
+            strike_key, timestamp, expiry, strike, is_put, bid_iv, ask_iv, apy = m.groups()
+            entries.append((asset, expiry.decode(), float(strike), is_put == b'true',
+                            float(bid_iv), float(ask_iv), float(apy)))
+    return entries
 
 
 def extract_spot_prices(html):
     """Extract spot prices from HTML."""
     spot_prices = {}
-    # Dynamically detect all assets from HTML
-    assets = re.findall(r'"([A-Z]{2,6})":\{"combinations"', html)
-
-    for asset in assets:
-        pattern = rf'"{asset}":\{{"combinations":\{{[^}}]*?"index":([\d.]+)'
-        match = re.search(pattern, html)
-        if match:
-            spot_prices[asset] = float(match.group(1))
-
+    for m in _SPOT_RE.finditer(html):
+        spot_prices.setdefault(m.group(1).decode('ascii'), float(m.group(2)))
     return spot_prices
 
 
-def calculate_iv_from_apy(spot, strike, expiry, apy, is_put):
-    """Calculate IV from APY using Black-Scholes."""
-    import math
-    from datetime import datetime
-
-    # Parse expiry to DTE
+def calc_dte(expiry):
+    """Days to expiry (at least 1) for a DDMMMYY expiry, or None if unparseable."""
     try:
         expiry_date = datetime.strptime(expiry, '%d%b%y')
-        now = datetime.utcnow()
-        dte = max(1, (expiry_date - now).days)
-    except:
-        return None
-
-    if dte <= 0 or apy <= 0 or spot <= 0 or strike <= 0:
+    except (TypeError, ValueError):
         return None
+    return max(1, (expiry_date - datetime.utcnow()).days)
+
+
+@njit(cache=True, fastmath=True)
+def _norm_cdf(x):
+    """Standard normal CDF."""
+    return 0.5 * (1.0 + math.erf(x * _SQRT_HALF))
+
+
+@njit(cache=True, fastmath=True)
+def _newton_iv_loop(drift, spot, discounted_strike, T, premium, tol, is_put):
+    """Per-row scalar Newton-Raphson; returns sigma, or -1.0 where it did not converge."""
+    n = spot.size
+    out = np.full(n, -1.0)
+    for i in range(n):
+        # Row invariants, hoisted out of the Newton iterations
+        t = T[i]
+        sqrt_T = math.sqrt(t)
+        s, k_disc, target, eps = spot[i], discounted_strike[i], premium[i], tol[i]
+        sigma = 0.5  # Initial guess
+        for _ in range(100):
+            sigma_sqrt_T = sigma * sqrt_T
+            d1 = (drift[i] + 0.5 * sigma * sigma * t) / sigma_sqrt_T
+            d2 = d1 - sigma_sqrt_T
+            if is_put[i]:
+                price = k_disc * _norm_cdf(-d2) - s * _norm_cdf(-d1)
+            else:
+                price = s * _norm_cdf(d1) - k_disc * _norm_cdf(d2)
+            diff = price - target
+            if abs(diff) < eps:
+                out[i] = sigma
+                break
+            vega = s * sqrt_T * math.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+            if vega < eps * 0.01:
+                break
+            sigma = min(5.0, max(0.01, sigma - diff / vega))
+    return out
+
+
+def _newton_iv_numpy(drift, spot, discounted_strike, T, premium, tol, is_put):
+    """Newton-Raphson on every row at once, iterating only over unfinished rows."""
+    sigma = np.full(spot.shape, -1.0)  # -1 marks rows that never converge
+    # Working set: original row positions plus their per-row inputs, shrunk as rows finish
+    idx = np.arange(spot.size)
+    sqrt_T = np.sqrt(T)
+    # Put rows price as -(S*N(-d1) - K*N(-d2)), so one sign covers both payoffs
+    sign = np.where(is_put, -1.0, 1.0)
+    a_sigma = np.full(idx.shape, 0.5)  # Initial guess
+    a_prev = np.full(idx.shape, np.nan)
+    a_drift, a_spot, a_K, a_T, a_sqrt_T = drift, spot, discounted_strike, T, sqrt_T
+    a_premium, a_tol, a_sign = premium, tol, sign
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(100):
+            sigma_sqrt_T = a_sigma * a_sqrt_T
+            d1 = (a_drift + 0.5 * a_sigma * a_sigma * a_T) / sigma_sqrt_T
+            d2 = d1 - sigma_sqrt_T
+
+            # One CDF call for both d1 and d2 halves the per-iteration overhead
+            n1, n2 = _ndtr(a_sign * np.stack((d1, d2)))
+            price = a_sign * (a_spot * n1 - a_K * n2)
+            diff = price - a_premium
+
+            done = np.abs(diff) < a_tol
+            sigma[idx[done]] = a_sigma[done]
 
-    T = dte / 365.0
-    r = 0.05  # Risk-free rate
+            # Vega (use relative threshold too)
+            vega = a_spot * a_sqrt_T * np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+            keep = ~done & (vega >= a_tol * 0.01)
+            if not keep.any():
+                break
 
-    # Collateral and premium from APY
-    collateral = strike if is_put else spot
-    premium = (apy / 100.0) * collateral * (dte / 365.0)
+            new_sigma = np.clip(a_sigma - diff / vega, 0.01, 5.0)
+            # Steps are deterministic, so a row that returns to its current or previous
+            # sigma (pinned at a clip bound) would cycle to the iteration cap unconverged
+            keep &= (new_sigma != a_sigma) & (new_sigma != a_prev)
+            if not keep.any():
+                break
 
-    # Newton-Raphson to find IV
-    sigma = 0.5  # Initial guess
-    converged = False
+            a_prev, a_sigma = a_sigma[keep], new_sigma[keep]
+            if not keep.all():
+                idx = idx[keep]
+                a_drift, a_spot, a_K, a_T, a_sqrt_T = (
+                    a_drift[keep], a_spot[keep], a_K[keep], a_T[keep], a_sqrt_T[keep])
+                a_premium, a_tol, a_sign = a_premium[keep], a_tol[keep], a_sign[keep]
 
-    # Use relative tolerance for small premiums
-    tol = max(0.0000001, premium * 0.001)  # 0.1% of premium or 1e-7
+    return sigma
 
-    for _ in range(100):
-        try:
-            d1 = (math.log(spot / strike) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-            d2 = d1 - sigma * math.sqrt(T)
 
-            # Standard normal CDF approximation
-            def norm_cdf(x):
-                return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+def calculate_ivs_from_apy(spot, strike, dte, apy, is_put):
+    """
+    Calculate IVs from APYs using Black-Scholes, batched across options.
 
-            if is_put:
-                price = strike * math.exp(-r * T) * norm_cdf(-d2) - spot * norm_cdf(-d1)
-            else:
-                price = spot * norm_cdf(d1) - strike * math.exp(-r * T) * norm_cdf(d2)
+    Uses the numba kernel when available, otherwise an equivalent
+    vectorized NumPy implementation.
+    Returns IV percentages, NaN where a row did not converge.
+    """
+    spot, strike, dte, apy = (np.asarray(a, dtype=float) for a in (spot, strike, dte, apy))
+    is_put = np.asarray(is_put, dtype=bool)
 
-            diff = price - premium
+    T = dte / 365.0
+    # log(S/K) + rT is constant per row across Newton iterations
+    drift = np.log(spot / strike) + RISK_FREE_RATE * T
+    discounted_strike = strike * np.exp(-RISK_FREE_RATE * T)
 
-            if abs(diff) < tol:
-                converged = True
-                break
+    # Collateral and premium from APY
+    premium = (apy / 100.0) * np.where(is_put, strike, spot) * T
 
-            # Vega (use relative threshold too)
-            vega = spot * math.sqrt(T) * math.exp(-d1 ** 2 / 2) / math.sqrt(2 * math.pi)
-            if vega < tol * 0.01:
-                break
+    # Use relative tolerance for small premiums: 0.1% of premium or 1e-7
+    tol = np.maximum(0.0000001, premium * 0.001)
 
-            sigma = sigma - diff / vega
-            sigma = max(0.01, min(5.0, sigma))
-        except (ValueError, ZeroDivisionError):
-            break
+    solve = _newton_iv_loop if NUMBA_AVAILABLE else _newton_iv_numpy
+    sigma = solve(drift, spot, discounted_strike, T, premium, tol, is_put)
 
     # Only return IV if converged and within reasonable bounds
-    if converged and 0.05 < sigma < 4.0:
-        return sigma * 100
-    return None
+    return np.where((sigma > 0.05) & (sigma < 4.0), sigma * 100, np.nan)
+
+
+def calculate_iv_from_apy(spot, strike, expiry, apy, is_put):
+    """Calculate IV from APY using Black-Scholes."""
+    dte = calc_dte(expiry)
+    if dte is None or apy <= 0 or spot <= 0 or strike <= 0:
+        return None
+    iv = calculate_ivs_from_apy([spot], [strike], [dte], [apy], [is_put])[0]
+    return None if np.isnan(iv) else float(iv)
 
 
 def save_records(records):
     """Save records to database."""
-    conn = get_db()
-    cursor = conn.cursor()
     timestamp = datetime.utcnow()
-
-    for r in records:
-        cursor.execute("""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        # One multi-row INSERT instead of a round-trip per record
+        execute_values(cursor, """
             INSERT INTO iv_snapshots (timestamp, asset, strike, expiry, bid_iv, ask_iv, mid_iv, option_type, apy)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (timestamp, r['asset'], r['strike'], r['expiry'], r['bid_iv'], r['ask_iv'], r['mid_iv'], r['option_type'], r['apy']))
+            VALUES %s
+        """, [(timestamp, r['asset'], r['strike'], r['expiry'], r['bid_iv'], r['ask_iv'], r['mid_iv'], r['option_type'], r['apy'])
+              for r in records], page_size=500)
+        conn.commit()
+        # The snapshot is already saved; a failed refresh only leaves /api/latest
+        # and /api/pricing one scrape behind, so log it rather than fail the cron.
+        # The refresh re-runs LATEST_SQL over the whole table, so it is exempt
+        # from the per-request statement timeout
+        try:
+            cursor.execute("SET LOCAL statement_timeout = 0")
+            cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY iv_latest_mv")
+            conn.commit()
+        except psycopg2.Error:
+            conn.rollback()
+            log.exception('Refreshing iv_latest_mv failed')
 
-    conn.commit()
-    conn.close()
+
+def fetch_and_save():
+    """Scrape a snapshot and store it; the page fetch overlaps schema setup."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch_iv_data)
+        init_db()
+        records = future.result()
+    if records:
+        save_records(records)
+        clear_response_cache()
+    return records
 
 
 # For local development
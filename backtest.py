@@ -8,10 +8,12 @@ Since we don't have actual option prices, we measure:
 - Comparison to baseline strategies
 """
 
+import math
 import os
 import sys
 from datetime import datetime, timedelta
 from collections import defaultdict
+from operator import itemgetter
 import statistics
 import random
 
@@ -70,7 +72,7 @@ def calc_sigma_root_t(iv, dte):
     """Calculate σ√T = IV × √(DTE/365)."""
     if dte is None or dte <= 0 or iv is None:
         return None
-    return iv * (dte / 365) ** 0.5
+    return iv * math.sqrt(dte / 365)
 
 
 def fetch_data(days=30):
@@ -113,12 +115,11 @@ def prepare_options_data(data):
                 'expiry': row['expiry']
             })
 
-    # Sort each option's data by timestamp
-    for key in options:
-        options[key] = sorted(options[key], key=lambda x: x['timestamp'])
-
-    # Filter to options with enough data
-    return {k: v for k, v in options.items() if len(v) >= 20}
+    # Filter to options with enough data, then sort each series in place by timestamp
+    options_data = {k: v for k, v in options.items() if len(v) >= 20}
+    for points in options_data.values():
+        points.sort(key=itemgetter('timestamp'))
+    return options_data
 
 
 def calculate_percentiles(options_data):